@@ -1,17 +1,10 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import time
+import io
+import uuid
 import random
-import json
-import os
-from datetime import datetime
-
-# IMPORTS BACKEND
-from backend.data import DataCollector
-from backend.analysts import QuantitativeAnalyst, SocialAnalyst, StrategyEngine, ChatAssistant
-from backend.engine import SimulationEngine
+from datetime import datetime, timedelta
+# pandas, plotly, pyarrow and the backend are imported in the app branch below,
+# so the landing page renders without paying for them.
 
 # --- 1. PAGE CONFIG ---
 st.set_page_config(
@@ -22,27 +15,10 @@ st.set_page_config(
 )
 
 # --- 2. GESTION HISTORIQUE & NAVIGATION ---
-HISTORY_FILE = "cognito_history.json"
-
-def load_history():
-    if not os.path.exists(HISTORY_FILE): return []
-    try:
-        with open(HISTORY_FILE, "r") as f: return json.load(f)
-    except: return []
-
-def save_to_history(asset, days, start_val, end_val, pnl_percent, ai_summary):
-    history = load_history()
-    new_entry = {
-        "Date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "Asset": asset.upper(),
-        "Duration": f"{days} Days",
-        "Initial ($)": start_val,
-        "Final ($)": end_val,
-        "PnL (%)": pnl_percent,
-        "Summary": ai_summary
-    }
-    history.insert(0, new_entry)
-    with open(HISTORY_FILE, "w") as f: json.dump(history, f, indent=4)
+@st.cache_resource
+def get_history_store():
+    from backend.history import HistoryStore
+    return HistoryStore()
 
 if 'page' not in st.session_state: st.session_state.page = 'landing'
 
@@ -253,8 +229,19 @@ if st.session_state.page == 'landing':
 # PARTIE B : APPLICATION PRINCIPALE
 # ==========================================
 elif st.session_state.page == 'app':
+    import pandas as pd
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    # IMPORTS BACKEND
+    from backend.data import DataCollector
+    from backend.analysts import QuantitativeAnalyst, SocialAnalyst, StrategyEngine, ChatAssistant
+    from backend.jobs import JobRunner
+    from backend.feed import MarketFeed
+    from backend.config import SIM_UI_FPS, FEED_POLL_SECS, SENTIMENT_TTL
+    from backend.swr import describe as describe_freshness
+    from backend.telemetry import get_tracer, traced
 
-    if 'sim_running' not in st.session_state: st.session_state.sim_running = False
     if 'sim_config' not in st.session_state: st.session_state.sim_config = {}
 
     @st.cache_resource
@@ -265,10 +252,50 @@ elif st.session_state.page == 'app':
         }
     sys = load_system()
 
-    @st.cache_data(ttl=300)
-    def get_cached_market_data(): return sys["Data"].get_market_scanner_data(50)
+    @st.cache_resource
+    def get_job_runner(): return JobRunner(history=get_history_store())
+    runner = get_job_runner()
+
+    def trace_parquet(job_id):
+        import pyarrow.parquet as pq
+        buf = io.BytesIO()
+        pq.write_table(runner.get(job_id).trace.to_arrow(), buf)
+        return buf.getvalue()
+
+    @st.cache_resource
+    def get_market_feed(): return MarketFeed()
+    market_feed = get_market_feed()
+    market_feed.reap()
+    # The feed is shared by every session: producer names are per session so one user's toggles never stop another's stream.
+    if "feed_session" not in st.session_state: st.session_state.feed_session = uuid.uuid4().hex[:12]
+    def feed_name(name): return f"{st.session_state.feed_session}:{name}"
+
+    @st.fragment(run_every=2)
+    def live_ticker(asset_ids, producer):
+        # Reads the shared bus ring buffers; the feed thread keeps publishing between reruns.
+        market_feed.touch(producer)
+        cols = st.columns(len(asset_ids))
+        for col, asset_id in zip(cols, asset_ids):
+            tick = market_feed.bus.latest(asset_id)
+            with col:
+                if tick is None: st.caption(f"📡 {asset_id}: waiting for first tick...")
+                else:
+                    st.metric(f"📡 {asset_id} ({tick.source})", f"${tick.price:,.4f}")
+                    st.line_chart(market_feed.bus.frame(asset_id, 300)["price"], height=120)
+
+    def get_cached_market_data(top=50):
+        # Backend stale-while-revalidate cache, shared by all sessions; batch_calculate mutates, so copy.
+        df, meta = sys["Data"].cached_scanner(top)
+        return (df.copy() if df is not None else pd.DataFrame()), meta
+
+    def get_scanner_sentiment(df):
+        # One batched LLM pass over the whole scanner, cached like the market data it is built from.
+        ids = tuple(df['id'].astype(str))
+        feeds = lambda: [(i, sys["Data"].generate_social_feed(i, c)) for i, c in zip(ids, df['price_change_percentage_24h'].fillna(0.0))]
+        return sys["Data"].cache.get(("sentiment", ids), lambda: sys["Social"].analyze_sentiment_batch(feeds()), SENTIMENT_TTL)
 
     # --- HELPERS ---
+    @traced("ui.gauge")
     def create_gauge(value, color_scale="Green"):
         color = "#00FFA3" if color_scale == "Green" else "#00C4CC"
         if value < 4: color = "#FF4B4B"
@@ -282,6 +309,7 @@ elif st.session_state.page == 'app':
         fig.update_layout(height=160, margin=dict(l=20, r=20, t=20, b=20), paper_bgcolor='rgba(0,0,0,0)', font={'color': "white"})
         return fig
 
+    @traced("ui.chart")
     def create_clean_chart(df, asset_name, change_24h):
         color = '#00FFA3' if change_24h >= 0 else '#FF4B4B'
         fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05, row_heights=[0.75, 0.25])
@@ -293,6 +321,7 @@ elif st.session_state.page == 'app':
    # --- SIDEBAR ---
     with st.sidebar:
         if st.button("🏠 EXIT TERMINAL"): go_to_home()
+        show_debug = st.toggle("🛠 Debug telemetry", value=st.query_params.get("debug") == "1", key="debug_panel")
         st.divider()
         st.header("💬 AI Assistant")
         
@@ -315,11 +344,15 @@ elif st.session_state.page == 'app':
             with st.chat_message("user"):
                 st.markdown(f'<div style="color: #29B6F6 !important; font-weight: 600;">{p}</div>', unsafe_allow_html=True)
 
-            # 2. Générer, sauvegarder et afficher AI (VERT)
-            response = sys["Chat"].respond(p)
-            st.session_state["msgs"].append({"role":"assistant", "content":response})
+            # 2. Générer (en streaming), sauvegarder et afficher AI (VERT)
             with st.chat_message("assistant"):
-                st.markdown(f'<div style="color: #00FFA3 !important;">{response}</div>', unsafe_allow_html=True)
+                answer_box = st.empty()
+                response = ""
+                for token in sys["Chat"].respond_stream(p):
+                    response += token
+                    answer_box.markdown(f'<div style="color: #00FFA3 !important;">{response}▌</div>', unsafe_allow_html=True)
+                answer_box.markdown(f'<div style="color: #00FFA3 !important;">{response}</div>', unsafe_allow_html=True)
+            st.session_state["msgs"].append({"role":"assistant", "content":response})
     # --- HEADER ---
     c_logo, c_title = st.columns([1, 6])
     with c_logo: st.markdown("## 💸")
@@ -333,13 +366,26 @@ elif st.session_state.page == 'app':
     st.markdown('<h3 style="color: #00FFA3;">🌍 Global Market Overview</h3>', unsafe_allow_html=True)
     
     with st.container(border=True):
-        df_market = get_cached_market_data()
+        c_size, c_sent = st.columns([3, 1])
+        with c_size: scan_size = st.radio("Universe", [50, 250, 1000], horizontal=True, format_func=lambda n: f"Top {n}", key="scan_size")
+        with c_sent: show_sentiment = st.toggle("🧠 Sentiment", key="scan_sentiment", help="Local fast scorer; unclear feeds are escalated to batched Ollama prompts (see the Source column)")
+        df_market, market_meta = get_cached_market_data(scan_size)
         assets_list = []
         if not df_market.empty:
+            st.caption(f"Market data {describe_freshness(market_meta)}")
             df_market = sys["Quant"].batch_calculate(df_market)
-            assets_list = [f"{row['symbol'].upper()} ({row['id']})" for _, row in df_market.iterrows()]
+            assets_list = (df_market['symbol'].astype(str).str.upper() + " (" + df_market['id'].astype(str) + ")").tolist()
+            columns = ['image', 'symbol', 'sparkline_processed', 'current_price', 'price_change_percentage_24h', 'Tech_Score']
+            if show_sentiment:
+                with st.spinner("Scoring sentiment..."): sentiment, _ = get_scanner_sentiment(df_market)
+                if sentiment is not None:
+                    scores = sentiment.set_index('asset')
+                    df_market['Sentiment'] = df_market['id'].astype(str).map(scores['sentiment_score'])
+                    df_market['Mood'] = df_market['id'].astype(str).map(scores['mood'].astype(str))
+                    df_market['Sentiment Source'] = df_market['id'].astype(str).map(scores['source'].astype(str))
+                    columns += ['Sentiment', 'Mood', 'Sentiment Source']
             st.dataframe(
-                df_market[['image', 'symbol', 'sparkline_processed', 'current_price', 'price_change_percentage_24h', 'Tech_Score']], 
+                df_market[columns], 
                 column_config={
                     "image": st.column_config.ImageColumn("", width="small"), 
                     "symbol": st.column_config.TextColumn("Ticker", width="small"),
@@ -347,6 +393,9 @@ elif st.session_state.page == 'app':
                     "current_price": st.column_config.NumberColumn("Price ($)", format="$%.4f"),
                     "price_change_percentage_24h": st.column_config.NumberColumn("24h %", format="%.2f %%"),
                     "Tech_Score": st.column_config.ProgressColumn("Cognito Score", min_value=0, max_value=10, format="%.1f/10"),
+                    "Sentiment": st.column_config.ProgressColumn("Sentiment", min_value=1, max_value=10, format="%.1f/10"),
+                    "Mood": st.column_config.TextColumn("Mood", width="small"),
+                    "Sentiment Source": st.column_config.TextColumn("Source", width="small", help="fast = local scorer, llm = Ollama, fallback = LLM unavailable"),
                 },
                 use_container_width=True, hide_index=True, height=400
             )
@@ -372,14 +421,17 @@ elif st.session_state.page == 'app':
             target = sel_asset
             with st.status(f"🚀 Initializing Deep Audit for **{target}**...", expanded=True) as status:
                 st.write("📡 Establishing secure connection to Market API...")
-                market = sys["Data"].get_real_time_data(target)
+                market, market_meta = sys["Data"].cached_quote(target)
+                if market is None: market = {"error": market_meta.get("error") or "no data"}
                 if "error" not in market:
+                    st.write(f"🕒 Quote {describe_freshness(market_meta)}")
                     st.write("🧮 Computing RSI, MACD & Volatility...")
-                    hist = sys["Data"].get_history(market['id'])
+                    hist, _ = sys["Data"].cached_history(market['id'])
+                    if hist is None: hist = pd.DataFrame()
                     q = sys["Quant"].calculate_deep_indicators(market, hist)
-                    st.write("🧠 Engaging LLM for Sentiment Analysis...")
-                    feed = sys["Data"].generate_social_feed(market['id'], market['change_24h'])
-                    social_res = sys["Social"].analyze_sentiment(feed)
+                    st.write("🧠 Scoring sentiment (local scorer, LLM for unclear feeds)...")
+                    social_feed = sys["Data"].generate_social_feed(market['id'], market['change_24h'])
+                    social_res = sys["Social"].analyze_sentiment(social_feed)
                     status.update(label="✅ Analysis Completed", state="complete", expanded=False)
 
                     st.divider()
@@ -388,6 +440,13 @@ elif st.session_state.page == 'app':
                     c_kpi2.metric("24h Volume", f"${market['volume_24h']:,.0f}")
                     c_kpi3.metric("Market Cap", f"${market['market_cap']:,.0f}")
                     c_kpi4.metric("RSI (14)", f"{q['RSI']}", delta_color="off")
+                    if q.get('Indicators'):
+                        c_ind1, c_ind2, c_ind3, c_ind4 = st.columns(4)
+                        fmt = lambda v, f: f.format(v) if v is not None else "N/A"
+                        c_ind1.metric("MACD Hist", fmt(q['MACD'], "{:,.4f}"))
+                        c_ind2.metric("Volatility (ATR %)", fmt(q['Volatility'], "{:.2f}%"))
+                        c_ind3.metric("Z-Score (20)", fmt(q['ZScore'], "{:+.2f}"))
+                        c_ind4.metric("Bollinger (20, 2)", f"{fmt(q['Indicators'].get('BB_Lower'), '${:,.2f}')} – {fmt(q['Indicators'].get('BB_Upper'), '${:,.2f}')}")
 
                     st.write("")
                     with st.container(border=True):
@@ -404,6 +463,7 @@ elif st.session_state.page == 'app':
                                 dynamic_social = social_res.get('sentiment_score', 5.0)
                                 st.plotly_chart(create_gauge(dynamic_social, "Blue"), use_container_width=True)
                                 st.markdown("<p style='text-align:center; color:#CCCCCC; font-weight:bold;'>Sentiment Score</p>", unsafe_allow_html=True)
+                                st.caption({"fast": "Local scorer", "llm": "LLM (Ollama)"}.get(social_res.get('source'), "Fallback: LLM unavailable"))
                         with col_summary:
                             st.info(f"**SIGNAL: {q['Signal']}**")
                             st.markdown(f"Outlook: **{social_res.get('mood', 'Neutral')}**")
@@ -414,8 +474,21 @@ elif st.session_state.page == 'app':
                         st.markdown('<h4 style="color: #00FFA3;">📉 Price Action (30D)</h4>', unsafe_allow_html=True)
                         with st.container(border=True):
                             st.plotly_chart(create_clean_chart(hist, market['id'], market['change_24h']), use_container_width=True)
+                    st.session_state.audit_asset_id = market['id']
                 else: st.error(f"Error: {market['error']}")
 
+        audit_id = st.session_state.get("audit_asset_id")
+        if audit_id:
+            c_live, c_replay = st.columns(2)
+            mode = "live" if c_live.toggle(f"📡 Stream {audit_id} live (every {FEED_POLL_SECS}s)", key="audit_live") else \
+                   "replay" if c_replay.toggle(f"⏪ Replay stored {audit_id} history", key="audit_replay") else None
+            for m in ("live", "replay"):
+                if m != mode: market_feed.stop(feed_name(f"audit-{m}"))
+            producer = feed_name(f"audit-{mode}")
+            if mode == "live": market_feed.ensure(producer, [audit_id], lambda: market_feed.start_polling(sys["Data"], [audit_id], name=producer))
+            if mode == "replay": market_feed.ensure(producer, [audit_id], lambda: market_feed.start_replay(sys["Data"], [audit_id], name=producer))
+            if mode: live_ticker([audit_id], producer)
+
     # --- TAB 2: DUEL ---
     with tab_duel:
         # MODIFICATION : Titre en vert forcé via HTML
@@ -426,13 +499,21 @@ elif st.session_state.page == 'app':
         b = c2.selectbox("Asset B", assets_list, index=1)
         if c3.button("VS", use_container_width=True):
             col_a, col_b = st.columns(2)
+            quotes = sys["Data"].cached_quotes([a, b])
             def show_mini(col, name):
                 with col:
-                    d = sys["Data"].get_real_time_data(name)
-                    if "error" not in d:
+                    d, meta = quotes[name]
+                    if d is not None:
                         with st.container(border=True):
                             st.metric(name, f"${d['price']}", f"{d['change_24h']}%")
+                            st.caption(describe_freshness(meta))
             show_mini(col_a, a); show_mini(col_b, b)
+        duel_ids = [sys["Data"].resolve_coin_id(a), sys["Data"].resolve_coin_id(b)]
+        duel_producer = feed_name("duel-live")
+        if st.toggle("📡 Live duel stream", key="duel_live"):
+            market_feed.ensure(duel_producer, duel_ids, lambda: market_feed.start_polling(sys["Data"], duel_ids, name=duel_producer))
+            live_ticker(duel_ids, duel_producer)
+        else: market_feed.stop(duel_producer)
 
     # --- TAB 3: SIMULATION ---
     with tab_strat:
@@ -454,87 +535,123 @@ elif st.session_state.page == 'app':
                 sim_cash = c2.number_input("Initial Cash ($)", min_value=500, max_value=100000, value=10000, step=500)
                 sim_qty = c3.number_input(f"Starting {sim_asset}", 0.5, step=0.1)
                 sim_days = c4.slider("Days", 5, 60, 10)
+                sim_backend = st.radio("Agent Backend", ["ollama", "rules"], horizontal=True, format_func=lambda b: {"ollama": "🧠 Llama 3 (Ollama)", "rules": "⚡ Rule-Based (Offline)"}[b])
+                sim_prices = st.radio("Price Path", ["synthetic", "replay"], horizontal=True, format_func=lambda p: {"synthetic": "🎲 Synthetic (noise + news)", "replay": "⏪ Replay real daily closes"}[p])
                 submitted = st.form_submit_button("🔴 INITIALIZE SIMULATION", type="primary", use_container_width=True)
 
         if submitted:
-            st.session_state.sim_running = True
-            st.session_state.sim_config = {"cash": sim_cash, "qty": sim_qty, "asset": sim_asset, "days": sim_days}
+            st.session_state.sim_config = {"cash": sim_cash, "qty": sim_qty, "asset": sim_asset, "asset_id": sys["Data"].resolve_coin_id(raw_asset),
+                                           "days": sim_days, "backend": sim_backend, "price_source": sim_prices}
+            st.session_state.sim_job = runner.submit(st.session_state.sim_config)
+
+        # The run lives in the background job runner; sim_monitor only subscribes to it. While the job runs it
+        # is a fragment refreshing at SIM_UI_FPS, so the rest of the page (History, debug panel) renders at once
+        # and only this block redraws; when the job ends it triggers one full rerun to settle the final view.
+        # The chart and report live in placeholders outside the fragment: the chart is only re-sent when a new
+        # day arrived (not on every frame), tracked per full script run by `run_token`.
+        def sim_monitor(job_id, cfg, chart_slot, report_slot, run_token):
+            job = runner.get(job_id)
+            if job is None: return
+            trace = job.trace
+            snap = runner.poll(job_id, since=max(0, len(trace) - 1))
+            offset, active = snap['offset'], snap['status'] in ("queued", "running")
+            if st.session_state.get("sim_live") and not active: st.rerun()
 
-        if st.session_state.sim_running:
-            cfg = st.session_state.sim_config
-            engine = SimulationEngine(cfg["cash"], cfg["qty"], cfg["asset"])
-            
             st.write("")
-            with st.status("🚀 Booting Agents...", expanded=True) as status:
-                time.sleep(0.5); st.write("🌍 Connecting..."); time.sleep(0.5); st.write("🤖 Agents deliberating...")
-                status.update(label="Simulation Live", state="complete", expanded=False)
-            
-            live_display = st.empty()
-            chart_display = st.empty()
-            full_table_data = []
-            history_vals = []
-            full_logs = ""
-
-            for day in range(1, cfg['days'] + 1):
-                s = engine.step(day)
-                history_vals.append({"Day": day, "Total Value": s['value'], "Baseline": engine.initial_val})
-                full_table_data.append({"Day": day, "Price": f"${s['price']:,.2f}", "Action": s['action'], "Reason": s['reason'], "Cash": f"${s['cash']:,.0f}", "Total Value": f"${s['value']:,.0f}", "AI Summary": s['explanation']})
-                full_logs += f"{s['explanation']}\n"
-                
-                with live_display.container():
-                    with st.container(border=True):
-                        c1, c2 = st.columns([3, 1])
-                        with c1:
-                            st.markdown(f"##### 📅 Day {day} / {cfg['days']}")
-                            
-                            # --- CORRECTION ICI : News en blanc/gris italique ---
-                            st.markdown(f"<div style='color: #CCCCCC; font-style: italic; margin-top: -10px;'>📰 NEWS: {s['headline']}</div>", unsafe_allow_html=True)
-                        with c2: st.metric("Asset Price", f"${s['price']:,.2f}")
-                        cols = st.columns(5)
-                        cols[0].metric("Tech", s['scores']['tech']); cols[1].metric("News", s['scores']['news'])
-                        cols[2].metric("Risk", s['scores']['risk']); cols[3].metric("Chaos", s['scores']['chaos'])
-                        cols[4].metric("AVG", f"{s['scores']['avg']:.0f}")
-                        if s['action'] == "BUY": st.success(f"✅ BUY ({s['reason']})")
-                        elif s['action'] == "SELL": st.error(f"🔻 SELL ({s['reason']})")
-                        else: st.info(f"⏸️ HOLD ({s['reason']})")
-
-                df_chart = pd.DataFrame(history_vals)
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(x=df_chart['Day'], y=df_chart['Baseline'], mode='lines', name='Start', line=dict(color='gray', dash='dash')))
-                fig.add_trace(go.Scatter(x=df_chart['Day'], y=df_chart['Total Value'], mode='lines+markers', name='Portfolio', line=dict(color='#00FFA3', width=3)))
-                fig.update_layout(title="📈 Live Performance", height=350, margin=dict(l=0, r=0, t=40, b=0), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='white'), hovermode="x unified")
-                chart_display.plotly_chart(fig, use_container_width=True)
-                time.sleep(0.1)
-
-            st.divider()
-            # MODIFICATION : Titre en vert forcé via HTML
-            st.markdown('<h3 style="color: #00FFA3;">🏁 Mission Report</h3>', unsafe_allow_html=True)
-            with st.spinner("Compiling Final Analysis..."):
-                final_report = engine.generate_final_report(full_logs)
-                st.success(final_report)
-            
-            # SAUVEGARDE HISTORIQUE
-            pnl_final = ((history_vals[-1]['Total Value'] - engine.initial_val) / engine.initial_val) * 100
-            save_to_history(cfg['asset'], cfg['days'], engine.initial_val, history_vals[-1]['Total Value'], pnl_final, final_report)
-            st.toast("Simulation saved to History!", icon="💾")
-
-            # MODIFICATION : Titre en vert forcé via HTML
-            st.markdown('<h3 style="color: #00FFA3;">📋 Transaction Log</h3>', unsafe_allow_html=True)
-            st.dataframe(pd.DataFrame(full_table_data), column_config={"AI Summary": st.column_config.TextColumn("AI Logic", width="large")}, use_container_width=True, hide_index=True)
-            st.session_state.sim_running = False
+            c_status, c_stop = st.columns([5, 1])
+            c_status.progress(snap['progress'], text=f"🤖 Agents deliberating... Day {offset} / {cfg['days']}" if active else f"Simulation {snap['status']}")
+            if active and c_stop.button("⏹ STOP", use_container_width=True): runner.cancel(job_id)
+
+            if snap['steps']:
+                s = snap['steps'][-1]
+                with st.container(border=True):
+                    c1, c2 = st.columns([3, 1])
+                    with c1:
+                        st.markdown(f"##### 📅 Day {s['day']} / {cfg['days']}")
+
+                        # --- CORRECTION ICI : News en blanc/gris italique ---
+                        st.markdown(f"<div style='color: #CCCCCC; font-style: italic; margin-top: -10px;'>📰 NEWS: {s['headline']}</div>", unsafe_allow_html=True)
+                    with c2: st.metric("Asset Price", f"${s['price']:,.2f}")
+                    cols = st.columns(5)
+                    cols[0].metric("Tech", s['scores']['tech']); cols[1].metric("News", s['scores']['news'])
+                    cols[2].metric("Risk", s['scores']['risk']); cols[3].metric("Chaos", s['scores']['chaos'])
+                    cols[4].metric("AVG", f"{s['scores']['avg']:.0f}")
+                    if s['action'] == "BUY": st.success(f"✅ BUY ({s['reason']})")
+                    elif s['action'] == "SELL": st.error(f"🔻 SELL ({s['reason']})")
+                    else: st.info(f"⏸️ HOLD ({s['reason']})")
+
+                if st.session_state.get("sim_chart_drawn") != (run_token, offset):
+                    # Chart straight from the trace's column slices (no per-step dicts), once per new day.
+                    points = pd.DataFrame({"Start": snap['initial_val'], "Portfolio": trace.column("value")[:offset]},
+                                          index=pd.Index(trace.column("day")[:offset], name="Day"))
+                    with chart_slot.container():
+                        st.markdown("##### 📈 Live Performance")
+                        st.line_chart(points, color=["#808080", "#00FFA3"], height=350)
+                    st.session_state.sim_chart_drawn = (run_token, offset)
+
+            with report_slot.container():
+                if snap['note'] and offset < cfg['days']: st.caption(f"🧠 Day {offset + 1}: {snap['note']}")
+                if offset >= cfg['days'] or snap['report']:
+                    # MODIFICATION : Titre en vert forcé via HTML
+                    st.markdown('<h3 style="color: #00FFA3;">🏁 Mission Report</h3>', unsafe_allow_html=True)
+                    if snap['report']: st.success(snap['report'] + ("" if snap['status'] == "done" else "▌"))
+                    else: st.info("Compiling Final Analysis...")
+
+        job_id = st.session_state.get("sim_job")
+        if job_id and runner.get(job_id) is None: job_id = None
+        if job_id:
+            cfg = st.session_state.sim_config
+            trace = runner.get(job_id).trace
+            snap = runner.poll(job_id, since=len(trace))
+            st.session_state.sim_live = snap['status'] in ("queued", "running")
+            monitor_box = st.container()
+            chart_slot, report_slot = st.empty(), st.empty()
+            with monitor_box:
+                (st.fragment(sim_monitor, run_every=1.0 / SIM_UI_FPS) if st.session_state.sim_live else sim_monitor)(
+                    job_id, cfg, chart_slot, report_slot, uuid.uuid4().hex)
+
+            if snap['status'] == "done":
+                # SAUVEGARDE HISTORIQUE (faite par le job) : notifier une seule fois
+                if st.session_state.get("sim_saved_toast") != job_id:
+                    st.session_state.sim_saved_toast = job_id
+                    st.toast("Simulation saved to History!", icon="💾")
+
+                # MODIFICATION : Titre en vert forcé via HTML
+                st.markdown('<h3 style="color: #00FFA3;">📋 Transaction Log</h3>', unsafe_allow_html=True)
+                st.dataframe(trace.display_frame(), column_config={
+                    "Price": st.column_config.NumberColumn(format="$%.2f"), "Cash": st.column_config.NumberColumn(format="$%.0f"),
+                    "Total Value": st.column_config.NumberColumn(format="$%.0f"), "AI Summary": st.column_config.TextColumn("AI Logic", width="large")},
+                    use_container_width=True, hide_index=True)
+                st.download_button("⬇️ Trace (Parquet)", trace_parquet(job_id), f"cognito_trace_{job_id}.parquet", use_container_width=True)
+            elif snap['status'] == "cancelled": st.warning("Simulation stopped.")
+            elif snap['status'] == "failed": st.error(f"Simulation failed: {snap['error']}")
 
     # --- TAB 4: HISTORY ---
     with tab_history:
         # MODIFICATION : Titre en vert forcé via HTML
         st.markdown('<h3 style="color: #00FFA3;">📜 Past Simulations Archive</h3>', unsafe_allow_html=True)
-        history_data = load_history()
-        
-        if not history_data:
+        history = get_history_store()
+        f1, f2, f3 = st.columns([2, 2, 1])
+        hist_asset = f1.selectbox("Asset", ["All"] + history.assets())
+        hist_range = f2.selectbox("Period", ["All time", "Last 24 hours", "Last 7 days", "Last 30 days"])
+        page_size = f3.selectbox("Rows", [25, 50, 100], index=0)
+        since = None
+        if hist_range != "All time":
+            span = {"Last 24 hours": 1, "Last 7 days": 7, "Last 30 days": 30}[hist_range]
+            since = (datetime.now() - timedelta(days=span)).strftime("%Y-%m-%d %H:%M")
+        asset_filter = None if hist_asset == "All" else hist_asset
+        total = history.count(asset=asset_filter, since=since)
+
+        if not total:
             st.info("No simulations recorded yet.")
         else:
+            pages = (total - 1) // page_size + 1
+            page = st.number_input(f"Page (1-{pages})", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+            history_data = history.query(asset=asset_filter, since=since, limit=page_size, offset=(page - 1) * page_size)
             df_history = pd.DataFrame(history_data)
+            st.caption(f"{total} simulations")
             st.dataframe(
-                df_history,
+                df_history.drop(columns=["id"]),
                 column_config={
                     "Date": st.column_config.TextColumn("Date", width="medium"),
                     "Asset": st.column_config.TextColumn("Asset", width="small"),
@@ -547,5 +664,42 @@ elif st.session_state.page == 'app':
                 use_container_width=True,
                 hide_index=True
             )
+            run_labels = {r["id"]: f"{r['Date']} • {r['Asset']} • {r['Duration']}" for r in history_data}
+            run_id = st.selectbox("Inspect run", list(run_labels), format_func=run_labels.get)
+            day_trace = history.trace(run_id)
+            if day_trace:
+                with st.expander("📋 Day-by-day trace"):
+                    st.dataframe(pd.DataFrame(day_trace), use_container_width=True, hide_index=True)
             if st.button("🗑️ Clear History"):
-                if os.path.exists(HISTORY_FILE): os.remove(HISTORY_FILE); st.rerun()
\ No newline at end of file
+                history.clear(); st.rerun()
+
+    # --- DEBUG PANEL (latency telemetry) ---
+    if show_debug:
+        tracer = get_tracer()
+        with st.expander("🛠 Telemetry: latency per operation", expanded=True):
+            stats = tracer.stats()
+            if not stats: st.info("No spans recorded yet. Run an audit or a simulation.")
+            else:
+                st.dataframe(pd.DataFrame(stats), use_container_width=True, hide_index=True,
+                             column_config={c: st.column_config.NumberColumn(format="%.1f") for c in ("total_ms", "mean_ms", "p50_ms", "p95_ms", "max_ms")})
+            llm_stats = tracer.llm_stats()
+            c_llm1, c_llm2, c_llm3, c_llm4 = st.columns(4)
+            c_llm1.metric("LLM calls", llm_stats["calls"], f"{llm_stats['cached']} cached", delta_color="off")
+            c_llm2.metric("Completion tokens", f"{llm_stats['completion_tokens']:,}")
+            c_llm3.metric("Tokens / sec", f"{llm_stats['tokens_per_sec']:.1f}")
+            c_llm4.metric("LLM wall time", f"{llm_stats['wall_secs']:.1f}s")
+            caches = tracer.cache_stats()
+            if caches:
+                cache_cols = st.columns(len(caches))
+                for col, (name, c) in zip(cache_cols, caches.items()):
+                    col.metric(f"{name} cache hit ratio", f"{c.get('hit_ratio', 0):.0%}", f"{c.get('size', 0)} entries", delta_color="off")
+            tiers = sys["Social"].metrics.as_dict()
+            if tiers["items"]:
+                c_s1, c_s2, c_s3 = st.columns(3)
+                c_s1.metric("Sentiment items", tiers["items"], f"{tiers['fast']} fast tier", delta_color="off")
+                c_s2.metric("Escalated to LLM", f"{tiers['escalation_rate']:.0%}", f"{tiers['escalated']} items", delta_color="off")
+                c_s3.metric("Tier agreement", "n/a" if tiers["agreement"] is None else f"{tiers['agreement']:.0%}", f"{tiers['compared']} compared", delta_color="off")
+            c_json, c_chrome, c_clear = st.columns(3)
+            c_json.download_button("⬇️ JSON", tracer.export_json(), "cognito_trace.json", "application/json", use_container_width=True)
+            c_chrome.download_button("⬇️ Chrome trace", tracer.export_chrome(), "cognito_trace.chrome.json", "application/json", use_container_width=True)
+            if c_clear.button("Reset spans", use_container_width=True): tracer.clear(); st.rerun()
@@ -0,0 +1,241 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from . import llm
+from .config import AGENT_MAX_WORKERS, AGENT_CALL_TIMEOUT, AGENT_BATCH_VOTES
+
+# Voting roles used by SimulationEngine: key -> persona given to the model.
+ROLES = {"tech": "Technical Analyst", "news": "News Sentiment Analyst", "risk": "Risk Manager"}
+
+class AgentBackend:
+    """Decision layer behind SimulationEngine: headline, role votes, daily summary and final report.
+
+    `facts` passed to the vote methods is a dict with symbol, move (fractional price change),
+    rsi (or None), headline, cash, crypto and price."""
+    name = "base"
+
+    def headline(self, symbol: str, mood: str, day: int) -> str:
+        raise NotImplementedError
+
+    def vote(self, role: str, facts: dict) -> int:
+        raise NotImplementedError
+
+    def votes(self, facts: dict) -> dict:
+        return {role: self.vote(role, facts) for role in ROLES}
+
+    def summary(self, symbol: str, day: int, headline: str, action: str, pnl_day: float) -> str:
+        raise NotImplementedError
+
+    def report(self, logs: str) -> str:
+        raise NotImplementedError
+
+    # Streaming variants yield text chunks; backends without token streaming yield the whole answer once.
+    def summary_stream(self, symbol: str, day: int, headline: str, action: str, pnl_day: float, cancel=None):
+        yield self.summary(symbol, day, headline, action, pnl_day)
+
+    def report_stream(self, logs: str, cancel=None):
+        yield self.report(logs)
+
+    def close(self):
+        pass
+
+def stream_or(chunks, fallback: str):
+    # Passes chunks through; if the stream fails before producing anything, yields `fallback` instead.
+    produced = False
+    try:
+        for chunk in chunks:
+            produced = True
+            yield chunk
+    except Exception:
+        if not produced: yield fallback
+
+
+def parse_votes(content: str, roles=ROLES) -> dict:
+    """Validates a {"tech": int, "news": int, "risk": int} answer. Returns only the roles with a valid 0-100 score."""
+    try: data = json.loads(content)
+    except (TypeError, ValueError):
+        match = re.search(r"\{.*\}", str(content), re.S)
+        try: data = json.loads(match.group(0)) if match else {}
+        except ValueError: data = {}
+    if not isinstance(data, dict): return {}
+    out = {}
+    for role in roles:
+        value = data.get(role)
+        if isinstance(value, bool): continue
+        try: value = float(value)
+        except (TypeError, ValueError): continue
+        if 0 <= value <= 100: out[role] = int(round(value))
+    return out
+
+
+class OllamaBackend(AgentBackend):
+    """LLM personas via Ollama. With batch_votes all roles answer one JSON prompt; otherwise (and for
+    any role the JSON answer misses) each role is asked separately, concurrently on a small thread pool.
+
+    A day therefore costs 3 calls (headline, votes, summary) instead of 5. The headline and summary
+    cannot join the vote call: the news vote and the engine's price move read the headline, and the
+    summary describes the action decided from the votes."""
+    name = "ollama"
+
+    def __init__(self, parallel=True, max_workers=AGENT_MAX_WORKERS, call_timeout=AGENT_CALL_TIMEOUT, batch_votes=AGENT_BATCH_VOTES):
+        self.call_timeout = call_timeout
+        self.batch_votes = batch_votes
+        self.batch_failures = 0
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="oracle") if parallel else None
+
+    @staticmethod
+    def context(role: str, facts: dict) -> str:
+        if role == "tech":
+            ctx = f"Price changed by {facts['move']*100:.2f}%. Volatility is {'High' if abs(facts['move'])>0.03 else 'Low'}."
+            if facts.get('rsi') is not None: ctx += f" RSI(14) is {facts['rsi']:.0f}."
+            return ctx
+        if role == "news": return f"The current headline is: '{facts['headline']}'."
+        return f"We have ${facts['cash']:.0f} in cash and {facts['crypto']:.2f} coins."
+
+    @staticmethod
+    def ask(persona: str, context: str, timeout: float = None) -> int:
+        prompt = f"""
+        Act as a {persona}.
+        Context: {context}
+        Task: Analyze the situation. Should we BUY or SELL?
+        Output ONLY a single integer score from 0 (Strong Sell) to 100 (Strong Buy).
+        No text, just the number.
+        """
+        try:
+            content = llm.chat(prompt, timeout=timeout)
+            nums = re.findall(r'\d+', content)
+            if nums: return int(nums[0])
+            else: return 50
+        except: return 50
+
+    def headline(self, symbol, mood, day):
+        try:
+            prompt_news = f"Generate a 1-sentence crypto headline about {symbol}. The mood must be: {mood}."
+            # Headlines are meant to vary day to day for the same mood, so they bypass the cache.
+            return llm.chat(prompt_news, use_cache=False).strip()
+        except: return f"Market is unpredictable regarding {symbol}."
+
+    def vote(self, role, facts):
+        return self.ask(ROLES[role], self.context(role, facts), self.call_timeout)
+
+    @classmethod
+    def committee_prompt(cls, facts: dict) -> str:
+        lines = "\n        ".join(f'- "{role}" ({persona}): {cls.context(role, facts)}' for role, persona in ROLES.items())
+        keys = ", ".join(f'"{role}": <int>' for role in ROLES)
+        return f"""
+        Act as a trading committee for {facts['symbol']}. Each member scores whether we should BUY or SELL,
+        from 0 (Strong Sell) to 100 (Strong Buy), using only their own context:
+        {lines}
+        Output ONLY a JSON object: {{{keys}}}
+        """
+
+    def ask_committee(self, facts: dict) -> dict:
+        try: return parse_votes(llm.chat(self.committee_prompt(facts), format="json", timeout=self.call_timeout))
+        except Exception: return {}
+
+    def votes(self, facts):
+        scores = {}
+        if self.batch_votes:
+            scores = self.ask_committee(facts)
+            if len(scores) == len(ROLES): return scores
+            self.batch_failures += 1
+        missing = [role for role in ROLES if role not in scores]
+        if self.pool is None:
+            scores.update({role: self.vote(role, facts) for role in missing})
+            return {role: scores[role] for role in ROLES}
+        futures = {role: self.pool.submit(self.vote, role, facts) for role in missing}
+        # One deadline for the whole round; failed or late calls fall back to the neutral score. A late call
+        # still holds its pool thread until its own HTTP timeout (the same call_timeout) ends it.
+        done, _ = wait(futures.values(), timeout=self.call_timeout)
+        for role, f in futures.items():
+            if f not in done: f.cancel(); scores[role] = 50; continue
+            try: scores[role] = f.result()
+            except Exception: scores[role] = 50
+        return {role: scores[role] for role in ROLES}
+
+    def summary(self, symbol, day, headline, action, pnl_day):
+        prompt = f"Summarize this trading day in 1 short English sentence: Asset {symbol}, News '{headline}', Action {action}, PnL {pnl_day:.2f}%."
+        try:
+            return llm.chat(prompt).strip()
+        except: return f"Day {day}: {action} executed."
+
+    def report(self, logs):
+        try:
+            return llm.chat(f"Write a short financial report based on these logs: {logs}")
+        except: return "Simulation Completed."
+
+    def summary_stream(self, symbol, day, headline, action, pnl_day, cancel=None):
+        prompt = f"Summarize this trading day in 1 short English sentence: Asset {symbol}, News '{headline}', Action {action}, PnL {pnl_day:.2f}%."
+        return stream_or(llm.stream_chat(prompt, cancel=cancel), f"Day {day}: {action} executed.")
+
+    def report_stream(self, logs, cancel=None):
+        return stream_or(llm.stream_chat(f"Write a short financial report based on these logs: {logs}", cancel=cancel), "Simulation Completed.")
+
+    def close(self):
+        if self.pool: self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class RuleBackend(AgentBackend):
+    """Deterministic, LLM-free agents for fast offline runs and Monte Carlo sweeps.
+    All randomness stays in the engine's RNG; given the same facts every method returns the same output."""
+    name = "rules"
+
+    # One template per mood. Keywords line up with the engine's news-bias rule ("bull"/"high" vs "bear"/"low").
+    HEADLINES = {
+        "Huge Pump": "{symbol} rockets to new highs as bulls take control.",
+        "Good News": "Bullish momentum builds for {symbol} after upbeat adoption news.",
+        "Neutral": "{symbol} trades sideways as the market waits for direction.",
+        "Bad News": "Bearish pressure mounts on {symbol} amid regulatory worries.",
+        "Major Crash": "{symbol} plunges to multi-month lows in a sharp sell-off.",
+    }
+    POSITIVE = ("bull", "high", "rally", "surge", "pump", "rocket", "upbeat", "adoption", "gain")
+    NEGATIVE = ("bear", "low", "crash", "plunge", "sell-off", "worr", "fear", "dump", "loss")
+
+    def headline(self, symbol, mood, day):
+        return self.HEADLINES.get(mood, self.HEADLINES["Neutral"]).format(symbol=symbol)
+
+    @staticmethod
+    def clamp(x):
+        return int(round(min(100.0, max(0.0, x))))
+
+    def score_tech(self, facts):
+        # Momentum-following, tempered by overbought/oversold RSI.
+        score = 50 + facts['move'] * 800
+        rsi = facts.get('rsi')
+        if rsi is not None:
+            if rsi > 70: score -= 15
+            elif rsi < 30: score += 15
+        return self.clamp(score)
+
+    def score_news(self, facts):
+        text = facts['headline'].lower()
+        pos = sum(w in text for w in self.POSITIVE)
+        neg = sum(w in text for w in self.NEGATIVE)
+        return self.clamp(50 + 15 * (pos - neg))
+
+    def score_risk(self, facts):
+        # Leans toward a 50/50 cash/crypto split and cuts exposure on sharp drops.
+        value = facts['cash'] + facts['crypto'] * facts['price']
+        exposure = (facts['crypto'] * facts['price'] / value) if value > 0 else 0.0
+        score = 50 + (0.5 - exposure) * 60
+        if facts['move'] < -0.03: score -= 10
+        return self.clamp(score)
+
+    def vote(self, role, facts):
+        return {"tech": self.score_tech, "news": self.score_news, "risk": self.score_risk}[role](facts)
+
+    def summary(self, symbol, day, headline, action, pnl_day):
+        return f"Day {day}: {action} on {symbol} after \"{headline}\" (PnL {pnl_day:+.2f}%)."
+
+    def report(self, logs):
+        lines = [l for l in str(logs).splitlines() if l.strip()]
+        counts = {a: sum(f": {a} on " in l for l in lines) for a in ("BUY", "SELL", "HOLD")}
+        return f"Simulation Completed. {len(lines)} trading days: {counts['BUY']} BUY, {counts['SELL']} SELL, {counts['HOLD']} HOLD."
+
+
+BACKENDS = {"ollama": OllamaBackend, "rules": RuleBackend}
+
+def make_backend(backend="ollama", **kwargs) -> AgentBackend:
+    if isinstance(backend, AgentBackend): return backend
+    if backend not in BACKENDS: raise ValueError(f"Unknown agent backend '{backend}'. Choose from {sorted(BACKENDS)}.")
+    return BACKENDS[backend](**kwargs)
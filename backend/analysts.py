@@ -1,33 +1,54 @@
 import pandas as pd
+import numpy as np
 import json
-import ollama
+import zlib
 import re
-import random
-from .config import OLLAMA_MODEL
+from concurrent.futures import ThreadPoolExecutor
+from . import llm
+from . import indicators
+from . import sparkline
+from .telemetry import traced
+from .config import SENTIMENT_BATCH_ITEMS, SENTIMENT_BATCH_CHARS, SENTIMENT_MAX_WORKERS, SENTIMENT_FAST_TIER, SENTIMENT_CONFIDENCE, SENTIMENT_AUDIT_RATE
+from .sentiment import FastSentiment, TierMetrics, mood_for, sampled
 
 class QuantitativeAnalyst:
+    @staticmethod
+    def symbol_variance(symbols: pd.Series) -> np.ndarray:
+        # Stable per-symbol jitter in [-1.0, 0.9]: crc32 is identical across processes, unlike hash().
+        codes, uniques = pd.factorize(symbols.astype(str), sort=False)
+        crc = np.fromiter((zlib.crc32(u.encode("utf-8")) for u in uniques), dtype=np.int64, count=len(uniques))
+        return ((crc % 20) / 10.0 - 1.0)[codes]
+
+    @staticmethod
+    def sparkline_rsi(sparklines: pd.Series, n: int = 14) -> np.ndarray:
+        matrix = sparkline.to_matrix(sparklines, pad_last=False)
+        if matrix.size == 0: return np.full(len(matrix), np.nan)
+        # Columns are coins; take each coin's RSI at its own last valid point.
+        return indicators.rsi(pd.DataFrame(matrix.T), n).ffill().iloc[-1].to_numpy(dtype=np.float64)
+
+    @traced("quant.batch")
     def batch_calculate(self, df: pd.DataFrame) -> pd.DataFrame:
         if df.empty: return df
-        def analyze_row(row):
-            change = row.get('price_change_percentage_24h', 0) or 0
-            base_score = 5.0
-            if change > 10: base_score += 3
-            elif change > 5: base_score += 2
-            elif change > 0: base_score += 1
-            elif change < -10: base_score -= 3
-            elif change < -5: base_score -= 2
-            variance = (hash(row['symbol']) % 20) / 10.0 - 1.0 
-            final_score = base_score + variance
-            final_score = max(1.0, min(10.0, final_score))
-            rsi = 50 + (change * 2.0)
-            rsi = max(20, min(90, rsi))
-            signal = "HOLD"
-            if rsi > 75: signal = "SELL"
-            elif rsi < 35: signal = "BUY"
-            return pd.Series([round(rsi, 1), float(final_score), signal])
-        df[['RSI', 'Tech_Score', 'Signal']] = df.apply(analyze_row, axis=1)
+        if 'price_change_percentage_24h' in df:
+            change = pd.to_numeric(df['price_change_percentage_24h'], errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)
+        else:
+            change = np.zeros(len(df))
+        base_score = 5.0 + np.select(
+            [change > 10, change > 5, change > 0, change < -10, change < -5],
+            [3.0, 2.0, 1.0, -3.0, -2.0], default=0.0)
+        final_score = np.clip(base_score + self.symbol_variance(df['symbol']), 1.0, 10.0)
+        rsi = np.clip(50 + change * 2.0, 20, 90)
+        if 'sparkline_in_7d' in df:
+            # Real Wilder RSI over the 7d sparkline where available, the 24h-change proxy elsewhere.
+            spark_rsi = self.sparkline_rsi(df['sparkline_in_7d'])
+            rsi = np.where(np.isnan(spark_rsi), rsi, spark_rsi)
+        signal = np.select([rsi > 75, rsi < 35], ["SELL", "BUY"], default="HOLD")
+        df['RSI'] = np.round(rsi, 1)
+        df['Tech_Score'] = final_score
+        df['Signal'] = signal
         return df
 
+    @traced("quant.deep")
     def calculate_deep_indicators(self, market_data: dict, history_df: pd.DataFrame) -> dict:
         if market_data.get("error"): return {"RSI": 50, "Score": 5, "Signal": "N/A"}
         change = market_data.get('change_24h', 0.0)
@@ -37,23 +58,147 @@ class QuantitativeAnalyst:
         elif change < -5: base_score -= 2.5
         elif change < -2: base_score -= 1.5
         score = max(1.0, min(10.0, base_score))
-        rsi = max(20, min(90, 50 + (change * 2.0)))
+        ind = indicators.latest_indicators(history_df)
+        rsi = ind.get('RSI_14')
+        if rsi is None: rsi = max(20, min(90, 50 + (change * 2.0)))
         signal = "STRONG BUY" if score >= 8 else "BUY" if score >= 6 else "STRONG SELL" if score <= 3 else "SELL" if score <= 4 else "NEUTRAL"
-        return {"RSI": round(rsi, 2), "Score": score, "Signal": signal}
+        return {"RSI": round(rsi, 2), "Score": score, "Signal": signal,
+                "MACD": ind.get('MACD_Hist'), "Volatility": ind.get('ATR_Pct'), "ZScore": ind.get('ZScore_20'),
+                "Indicators": ind}
+
+MOODS = ("Bullish", "Bearish", "Neutral")
+NEUTRAL_SENTIMENT = {"sentiment_score": 5.0, "mood": "Neutral"}
+# JSON schema handed to Ollama's structured output for batch prompts.
+SENTIMENT_SCHEMA = {"type": "object", "required": ["results"], "properties": {"results": {"type": "array", "items": {
+    "type": "object", "required": ["id", "sentiment_score", "mood"],
+    "properties": {"id": {"type": "string"}, "sentiment_score": {"type": "number", "minimum": 1, "maximum": 10},
+                   "mood": {"type": "string", "enum": list(MOODS)}}}}}}
+
+def parse_sentiment(item) -> dict:
+    """Validates one {"sentiment_score", "mood"} answer (score clamped to 1-10). None if unusable."""
+    if not isinstance(item, dict): return None
+    try: score = float(item.get("sentiment_score"))
+    except (TypeError, ValueError): return None
+    if score != score: return None
+    mood = str(item.get("mood", "")).strip().capitalize()
+    if mood not in MOODS: mood = mood_for(score)
+    return {"sentiment_score": min(10.0, max(1.0, score)), "mood": mood}
 
 class SocialAnalyst:
-    def analyze_sentiment(self, feed: list) -> dict:
+    """Two-tier sentiment: FastSentiment settles clear cases locally, low-confidence feeds (and a small
+    deterministic sample of confident ones, to measure agreement) go to the LLM. See self.metrics."""
+
+    def __init__(self, max_items=SENTIMENT_BATCH_ITEMS, max_chars=SENTIMENT_BATCH_CHARS, max_workers=SENTIMENT_MAX_WORKERS,
+                 fast_tier=SENTIMENT_FAST_TIER, confidence=SENTIMENT_CONFIDENCE, audit_rate=SENTIMENT_AUDIT_RATE):
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self.max_workers = max_workers
+        self.fast = FastSentiment() if fast_tier else None
+        self.confidence = confidence
+        self.audit_rate = audit_rate
+        self.metrics = TierMetrics()
+
+    def _llm_sentiment(self, feed: list) -> dict:
         text_blob = " ".join(feed)
         prompt = f"""Analyze sentiment: "{text_blob}". Return ONLY JSON: {{ "sentiment_score": float(1.0-10.0), "mood": "Bullish/Bearish/Neutral" }}"""
         try:
-            response = ollama.chat(model=OLLAMA_MODEL, messages=[{'role': 'user', 'content': prompt}])
-            content = response['message']['content']
-            match = re.search(r'\{.*\}', content, re.DOTALL)
-            if match:
-                return json.loads(match.group())
-            return {"sentiment_score": random.uniform(4.5, 5.5), "mood": "Neutral"}
-        except: 
-            return {"sentiment_score": random.uniform(4.5, 5.5), "mood": "Neutral"}
+            match = re.search(r'\{.*\}', llm.chat(prompt), re.DOTALL)
+            return parse_sentiment(json.loads(match.group())) if match else None
+        except Exception:
+            return None
+
+    @traced("social.sentiment")
+    def analyze_sentiment(self, feed: list) -> dict:
+        # {"sentiment_score", "mood", "source"}; source is "fast", "llm" or "fallback" as in analyze_sentiment_batch.
+        # Failed LLM answers fall back to the fast-tier score (or a fixed neutral one), so results stay reproducible.
+        if self.fast is None:
+            slow = self._llm_sentiment(feed)
+            return {**slow, "source": "llm"} if slow else {**NEUTRAL_SENTIMENT, "source": "fallback"}
+        scores, conf = self.fast.score([feed])
+        fast = {"sentiment_score": float(scores[0]), "mood": mood_for(scores[0]), "source": "fast"}
+        confident = bool(conf[0] >= self.confidence)
+        audit = confident and sampled(" ".join(feed), self.audit_rate)
+        if confident and not audit:
+            self.metrics.record(1, 0, 0, [])
+            return fast
+        slow = self._llm_sentiment(feed)
+        self.metrics.record(1, int(not confident), int(audit), [(fast["sentiment_score"], slow["sentiment_score"], slow["mood"])] if slow else [])
+        return fast if confident else ({**slow, "source": "llm"} if slow else {**fast, "source": "fallback"})
+
+    def pack(self, items: list) -> list:
+        """Greedy split of [(asset, posts)] into batches bounded by item count and prompt characters.
+        Posts are trimmed so a single oversized feed still fits a batch on its own."""
+        batches, current, size = [], [], 0
+        for asset, posts in items:
+            posts = [str(p) for p in (posts or [])]
+            budget = self.max_chars
+            trimmed = []
+            for p in posts:
+                if budget <= 0: break
+                trimmed.append(p[:budget]); budget -= len(trimmed[-1])
+            cost = len(asset) + sum(len(p) for p in trimmed) + 16
+            if current and (len(current) >= self.max_items or size + cost > self.max_chars):
+                batches.append(current); current, size = [], 0
+            current.append((asset, trimmed)); size += cost
+        if current: batches.append(current)
+        return batches
+
+    @staticmethod
+    def batch_prompt(batch: list) -> str:
+        payload = json.dumps([{"id": asset, "posts": posts} for asset, posts in batch], ensure_ascii=False)
+        return f"""Rate the social sentiment of each crypto asset from its posts.
+Items: {payload}
+Return ONLY JSON: {{"results": [{{"id": <item id>, "sentiment_score": <1.0-10.0>, "mood": "Bullish" | "Bearish" | "Neutral"}}]}} with exactly one result per item id."""
+
+    def _run_batch(self, batch: list) -> dict:
+        try: data = json.loads(llm.chat(self.batch_prompt(batch), format=SENTIMENT_SCHEMA))
+        except Exception: return {}
+        results = data.get("results", []) if isinstance(data, dict) else []
+        wanted = {asset for asset, _ in batch}
+        out = {}
+        for r in results if isinstance(results, list) else []:
+            parsed = parse_sentiment(r)
+            if parsed and isinstance(r, dict) and r.get("id") in wanted: out.setdefault(r["id"], parsed)
+        return out
+
+    def _llm_batch(self, items: list) -> dict:
+        # Batches run max_workers at a time; items a batch answer leaves out are retried once on their own.
+        results = {}
+        if not items: return results
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sentiment") as pool:
+            for out in pool.map(self._run_batch, self.pack(items)): results.update(out)
+            missing = [(a, p) for a, p in items if a not in results]
+            if len(items) > 1:
+                for out in pool.map(self._run_batch, [[m] for m in missing]): results.update(out)
+        return results
+
+    @traced("social.sentiment_batch")
+    def analyze_sentiment_batch(self, items) -> pd.DataFrame:
+        """items: {asset: posts} or [(asset, posts)]. Returns one row per asset, in input order: asset,
+        sentiment_score and confidence (float32; confidence is the fast tier's), mood and source (categoricals;
+        source is "fast", "llm", or "fallback" when an escalated item got no usable LLM answer)."""
+        items = list(items.items()) if isinstance(items, dict) else [tuple(i) for i in items]
+        items = list(dict((str(a), [str(p) for p in (posts or [])]) for a, posts in items).items())
+        n = len(items)
+        if self.fast is not None: scores, conf = self.fast.score([p for _, p in items])
+        else: scores, conf = np.full(n, NEUTRAL_SENTIMENT["sentiment_score"], dtype=np.float32), np.zeros(n, dtype=np.float32)
+        confident = (conf >= self.confidence) if self.fast is not None else np.zeros(n, dtype=bool)
+        audit = confident & np.fromiter((sampled(" ".join(p), self.audit_rate) for _, p in items), dtype=bool, count=n)
+        results = self._llm_batch([items[i] for i in np.flatnonzero(~confident | audit)])
+        rows = []
+        for i, (a, _) in enumerate(items):
+            if confident[i]: rows.append((a, float(scores[i]), mood_for(scores[i]), "fast"))
+            elif a in results: rows.append((a, results[a]["sentiment_score"], results[a]["mood"], "llm"))
+            else: rows.append((a, float(scores[i]), mood_for(scores[i]), "fallback"))
+        if self.fast is not None:
+            pairs = [(float(scores[i]), results[a]["sentiment_score"], results[a]["mood"]) for i, (a, _) in enumerate(items) if a in results]
+            self.metrics.record(n, int(n - confident.sum()), int(audit.sum()), pairs)
+        df = pd.DataFrame(rows, columns=["asset", "sentiment_score", "mood", "source"])
+        df["sentiment_score"] = df["sentiment_score"].astype(np.float32)
+        df["confidence"] = conf.astype(np.float32)
+        df["mood"] = pd.Categorical(df["mood"], categories=MOODS)
+        df["source"] = pd.Categorical(df["source"], categories=("fast", "llm", "fallback"))
+        return df
 
 class StrategyEngine:
     def generate_executive_summary(self, asset_id, market, quant, social) -> str:
@@ -62,9 +207,17 @@ class StrategyEngine:
         return "Legacy Advisor Mode."
 
 class ChatAssistant:
+    def prompt(self, text: str) -> str:
+        return f"Answer shortly in English only about crypto else say sorry i am an ai agent and i can only answer about crypto: {text}"
+
+    @traced("chat.respond")
     def respond(self, text: str) -> str:
-        prompt = f"Answer shortly in English only about crypto else say sorry i am an ai agent and i can only answer about crypto: {text}"
         try:
-            response = ollama.chat(model=OLLAMA_MODEL, messages=[{'role': 'user', 'content': prompt}])
-            return response['message']['content']
-        except Exception as e: return f"Error: {e}"
\ No newline at end of file
+            return llm.chat(self.prompt(text))
+        except Exception as e: return f"Error: {e}"
+
+    def respond_stream(self, text: str, cancel=None):
+        # Yields the answer token by token; closing the generator (or setting `cancel`) stops generation.
+        try:
+            yield from llm.stream_chat(self.prompt(text), cancel=cancel)
+        except Exception as e: yield f"Error: {e}"
\ No newline at end of file
@@ -0,0 +1,115 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .config import API_WORKERS
+
+# Headless entry points over the same objects the Streamlit app uses: Deep Audits for many assets
+# and batches of simulations, with results streamed as flat records (see cli.py for the command line).
+
+AUDIT_FIELDS = (("asset", "string"), ("id", "string"), ("ts", "float64"), ("price", "float64"), ("change_24h", "float64"),
+                ("volume_24h", "float64"), ("market_cap", "float64"), ("rsi", "float64"), ("score", "float64"), ("signal", "string"),
+                ("macd_hist", "float64"), ("atr_pct", "float64"), ("zscore", "float64"), ("sentiment_score", "float64"),
+                ("mood", "string"), ("history_points", "int64"), ("error", "string"))
+SIMULATION_FIELDS = (("name", "string"), ("asset", "string"), ("days", "int64"), ("backend", "string"), ("seed", "int64"),
+                     ("price_source", "string"), ("initial_val", "float64"), ("final_val", "float64"), ("pnl_pct", "float64"),
+                     ("buys", "int64"), ("sells", "int64"), ("holds", "int64"), ("elapsed_secs", "float64"),
+                     ("run_id", "int64"), ("report", "string"), ("error", "string"))
+
+def schema(fields):
+    import pyarrow as pa
+    return pa.schema([(name, getattr(pa, kind)()) for name, kind in fields])
+
+class Toolkit:
+    """The analysis objects shared by every call (one HTTP pool, one rate limiter, one LLM cache)."""
+
+    def __init__(self, collector=None, quant=None, social=None):
+        from .analysts import QuantitativeAnalyst, SocialAnalyst
+        from .data import DataCollector
+        self.collector = collector or DataCollector()
+        self.quant = quant or QuantitativeAnalyst()
+        self.social = social or SocialAnalyst()
+
+def run_audit(asset: str, toolkit: Toolkit = None, sentiment=True, days=30, market=None, social=None) -> dict:
+    """Deep Audit of one asset (CoinGecko id, "BTC (bitcoin)" or a ticker in data.SYMBOL_IDS), as a flat record. Failures are reported in "error".
+    social: a precomputed {"sentiment_score", "mood"} (from a batch) used instead of a per-asset LLM call."""
+    tk = toolkit or Toolkit()
+    record = {"asset": asset, "ts": time.time()}
+    try:
+        market = market or tk.collector.get_real_time_data(asset)
+        if "error" in market: return {**record, "error": market["error"]}
+        hist = tk.collector.get_history(market["id"], days)
+        q = tk.quant.calculate_deep_indicators(market, hist)
+        record.update({"id": market["id"], "price": market["price"], "change_24h": market["change_24h"], "volume_24h": market["volume_24h"],
+                       "market_cap": market["market_cap"], "rsi": q["RSI"], "score": q["Score"], "signal": q["Signal"],
+                       "macd_hist": q.get("MACD"), "atr_pct": q.get("Volatility"), "zscore": q.get("ZScore"), "history_points": len(hist)})
+        if sentiment:
+            social = social or tk.social.analyze_sentiment(tk.collector.generate_social_feed(market["id"], market["change_24h"]))
+            record.update({"sentiment_score": social.get("sentiment_score"), "mood": social.get("mood")})
+        return record
+    except Exception as e:
+        return {**record, "error": str(e)}
+
+def run_audits(assets, toolkit: Toolkit = None, workers=API_WORKERS, sentiment=True, days=30):
+    """Generator of audit records in input order. Quotes for all assets come from bulk /simple/price calls and
+    sentiment from batched LLM prompts; history runs on `workers` threads (sharing the process-wide rate limiter)."""
+    tk = toolkit or Toolkit()
+    assets = list(assets)
+    quotes = tk.collector.get_real_time_data_bulk(assets)
+    moods = {}
+    if sentiment:
+        ok = {q["id"]: q for q in quotes.values() if q and "error" not in q}
+        frame = tk.social.analyze_sentiment_batch([(i, tk.collector.generate_social_feed(i, q["change_24h"])) for i, q in ok.items()])
+        moods = {r.asset: {"sentiment_score": float(r.sentiment_score), "mood": r.mood} for r in frame.itertuples()}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audit") as pool:
+        yield from pool.map(lambda a: run_audit(a, tk, sentiment, days, market=quotes.get(a),
+                                                social=moods.get((quotes.get(a) or {}).get("id"))), assets)
+
+def run_simulation(config: dict, history=None, trace_path: str = None) -> dict:
+    """One SimulationEngine run. config takes the JobRunner keys (cash, qty, asset, days, backend, seed,
+    start_price, params, price_source, asset_id, batch_votes) plus optional name and report (default True).
+    Returns the flat summary record plus "trace" (a SimulationTrace)."""
+    from .engine import SimulationEngine
+    from .trace import SimulationTrace, ACTION_CODES
+    cfg = {"cash": 10000, "qty": 0.5, "days": 30, "backend": "rules", **config}
+    record = {"name": cfg.get("name"), "asset": cfg["asset"], "days": cfg["days"], "backend": cfg["backend"], "seed": cfg.get("seed"),
+              "price_source": cfg.get("price_source", "synthetic")}
+    started = time.perf_counter()
+    engine = None
+    try:
+        prices = cfg.get("prices")
+        if prices is None and cfg.get("price_source") == "replay":
+            from .data import DataCollector, SYMBOL_IDS
+            from .feed import replay_prices
+            asset_id = cfg.get("asset_id") or SYMBOL_IDS.get(cfg["asset"].upper(), cfg["asset"].lower())
+            prices = replay_prices(DataCollector(), asset_id, cfg["days"]) or None
+        options = {"batch_votes": cfg["batch_votes"]} if "batch_votes" in cfg else {}
+        engine = SimulationEngine(cfg["cash"], cfg["qty"], cfg["asset"], backend=cfg["backend"], seed=cfg.get("seed"),
+                                  start_price=cfg.get("start_price"), params=cfg.get("params"), prices=prices, **options)
+        trace = SimulationTrace(capacity=cfg["days"], initial_val=engine.initial_val, symbol=cfg["asset"])
+        for day in range(1, cfg["days"] + 1): trace.append(engine.step(day))
+        report = engine.generate_final_report(trace.logs()) if cfg.get("report", True) else None
+        final_val = float(trace.column("value")[-1])
+        pnl = (final_val - engine.initial_val) / engine.initial_val * 100
+        actions = trace.column("action")
+        record.update({"initial_val": engine.initial_val, "final_val": final_val, "pnl_pct": pnl, "report": report,
+                       **{f"{a.lower()}s": int((actions == code).sum()) for a, code in ACTION_CODES.items()}})
+        if history is not None: record["run_id"] = history.append(cfg["asset"], cfg["days"], engine.initial_val, final_val, pnl, report or "", trace=trace)
+        if trace_path: trace.write_parquet(trace_path)
+        record["trace"] = trace
+    except Exception as e:
+        record["error"] = str(e)
+    finally:
+        if engine is not None: engine.close()
+        record["elapsed_secs"] = time.perf_counter() - started
+    return record
+
+def run_simulations(configs, workers=API_WORKERS, history=None, trace_dir: str = None):
+    """Generator of run_simulation records in config order, `workers` runs at a time (threads: runs are
+    LLM/HTTP bound; for large rule-based parameter studies use sweep.run_sweep instead)."""
+    import os
+    if trace_dir: os.makedirs(trace_dir, exist_ok=True)
+    def one(item):
+        i, cfg = item
+        path = os.path.join(trace_dir, f"{i:05d}_{cfg.get('name') or cfg['asset']}.parquet") if trace_dir else None
+        return run_simulation(cfg, history=history, trace_path=path)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="simulate") as pool:
+        yield from pool.map(one, enumerate(configs))
@@ -0,0 +1,139 @@
+import numpy as np
+from .agents import RuleBackend
+from .engine import MOODS, StrategyParams
+
+NOISE_SENTIMENTS = np.array([-1, 1, 0, 0, 1])
+
+class NumpyRandom:
+    """random.Random-compatible facade over a NumPy Generator.
+
+    Passing NumpyRandom(seed) as SimulationEngine(rng=...) makes the scalar engine draw from the
+    same stream as BatchSimulator with n_paths=1, so the two can be compared step for step."""
+
+    def __init__(self, seed=None):
+        self.gen = np.random.default_rng(seed)
+
+    def choice(self, seq):
+        return seq[int(self.gen.integers(0, len(seq)))]
+
+    def uniform(self, a, b):
+        return float(self.gen.uniform(a, b))
+
+    def random(self):
+        return float(self.gen.random())
+
+    def randint(self, a, b):
+        return int(self.gen.integers(a, b + 1))
+
+
+class BatchResult:
+    def __init__(self, initial_value, final_value, max_drawdown, trades, values=None):
+        self.initial_value = initial_value
+        self.final_value = final_value
+        self.max_drawdown = max_drawdown
+        self.trades = trades
+        self.values = values  # (n_paths, days) when keep_paths=True
+
+    @property
+    def pnl_pct(self):
+        return (self.final_value - self.initial_value) / self.initial_value * 100
+
+    @property
+    def win_rate(self):
+        return float(np.mean(self.final_value > self.initial_value))
+
+    def summary(self) -> dict:
+        pnl = self.pnl_pct
+        q = [float(v) for v in np.percentile(pnl, [5, 25, 50, 75, 95])]
+        return {"paths": int(pnl.size), "win_rate": self.win_rate,
+                "pnl_mean": float(pnl.mean()), "pnl_std": float(pnl.std()),
+                "pnl_p5": q[0], "pnl_p25": q[1], "pnl_p50": q[2], "pnl_p75": q[3], "pnl_p95": q[4],
+                "max_drawdown_mean": float(self.max_drawdown.mean()), "max_drawdown_p95": float(np.percentile(self.max_drawdown, 95)),
+                "trades_mean": float(self.trades.mean())}
+
+
+class BatchSimulator:
+    """Runs n_paths independent copies of SimulationEngine(backend='rules') for `days` days as NumPy arrays.
+
+    Per day it applies the same steps as SimulationEngine.step: mood, noise shock, news bias, price update,
+    the rule-based Tech/News/Risk scores, the chaos vote and the consensus buy/sell rule. Only the rule
+    backend can be batched; LLM votes are inherently per call."""
+
+    def __init__(self, user_cash, user_qty, start_price, symbol="BTC", seed=None, params=None):
+        self.params = StrategyParams.coerce(params)
+        self.user_cash = float(user_cash)
+        self.user_qty = float(user_qty)
+        self.start_price = float(start_price)
+        self.symbol = symbol
+        self.seed = seed
+        self.rules = RuleBackend()
+        # Headlines are a pure function of the mood, so the news bias and News vote are per-mood constants.
+        headlines = [self.rules.headline(symbol, m, 0).lower() for m in MOODS]
+        self.mood_bias = np.array([0.04 if ("bull" in h or "high" in h) else -0.04 if ("bear" in h or "low" in h) else 0.0 for h in headlines])
+        self.mood_news = np.array([self.rules.score_news({"headline": h}) for h in headlines])
+
+    def run(self, n_paths: int, days: int, keep_paths: bool = False, rng=None) -> BatchResult:
+        gen = rng if rng is not None else np.random.default_rng(self.seed)
+        n = int(n_paths)
+        price = np.full(n, self.start_price)
+        cash = np.full(n, self.user_cash)
+        crypto = np.full(n, self.user_qty)
+        initial = cash + crypto * price
+        peak = initial.copy()
+        max_dd = np.zeros(n)
+        trades = np.zeros(n, dtype=np.int32)
+        values = np.empty((n, days)) if keep_paths else None
+        avg_gain = avg_loss = None
+        alpha = 1.0 / 14
+        p = self.params
+
+        for d in range(days):
+            # Draw order matches SimulationEngine.step: mood, noise sentiment, noise volatility, news factor, chaos.
+            mood = gen.integers(0, len(MOODS), size=n)
+            sentiment = NOISE_SENTIMENTS[gen.integers(0, len(NOISE_SENTIMENTS), size=n)]
+            volatility = gen.uniform(0.005, 0.04, size=n)
+            news_u = gen.random(n)
+            chaos = gen.integers(0, 101, size=n)
+
+            move = sentiment * volatility + self.mood_bias[mood] * news_u
+            prev_price = price
+            price = price * (1 + move)
+
+            # Wilder RSI(14) state, as in IncrementalIndicators (start price is the first sample).
+            delta = price - prev_price
+            gain, loss = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+            if avg_gain is None: avg_gain, avg_loss = gain, loss
+            else:
+                avg_gain = avg_gain + alpha * (gain - avg_gain)
+                avg_loss = avg_loss + alpha * (loss - avg_loss)
+
+            tech = 50 + move * 800
+            if d + 2 > 14:
+                safe_loss = np.where(avg_loss == 0, 1.0, avg_loss)
+                rsi = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / safe_loss))
+                tech = tech - 15 * (rsi > 70) + 15 * (rsi < 30)
+            s_tech = np.rint(np.clip(tech, 0, 100)).astype(np.int64)
+
+            value = cash + crypto * price
+            exposure = np.where(value > 0, crypto * price / np.where(value > 0, value, 1.0), 0.0)
+            risk = 50 + (0.5 - exposure) * 60 - 10 * (move < -0.03)
+            s_risk = np.rint(np.clip(risk, 0, 100)).astype(np.int64)
+
+            avg_score = (s_tech + self.mood_news[mood] + s_risk + chaos) / 4
+            buy = (avg_score >= p.buy_threshold) & (cash > 0)
+            sell = ~buy & (avg_score <= p.sell_threshold) & (crypto > 0)
+
+            bought = (cash * p.buy_fraction) / price
+            crypto = np.where(buy, crypto + bought, crypto)
+            cash = np.where(buy, cash - cash * p.buy_fraction, cash)
+            sold = crypto * p.sell_fraction
+            cash = np.where(sell, cash + sold * price, cash)
+            crypto = np.where(sell, crypto - sold, crypto)
+            trades += buy | sell
+
+            value = cash + crypto * price
+            peak = np.maximum(peak, value)
+            max_dd = np.maximum(max_dd, (peak - value) / peak * 100)
+            if keep_paths: values[:, d] = value
+
+        return BatchResult(initial, cash + crypto * price, max_dd, trades, values)
@@ -0,0 +1,111 @@
+"""Headless Cognito: Deep Audits and simulations from the command line.
+
+    python -m backend.cli audit BTC ETH solana --out audits.jsonl
+    python -m backend.cli audit --top 250 --workers 8 --no-sentiment --out nightly.parquet
+    python -m backend.cli simulate --asset BTC --days 30 --backend rules --seed 7
+    python -m backend.cli simulate --config runs.json --workers 4 --out sims.parquet --traces traces/ --save-history
+
+A simulation config file is JSON (a list of runs, or {"defaults": {...}, "runs": [...]}) or JSONL,
+each run using the JobRunner keys: asset, days, cash, qty, backend, seed, start_price, params, price_source.
+"""
+import argparse
+import json
+import sys
+import time
+from . import api
+from .config import API_WORKERS
+
+def load_assets(args) -> list:
+    assets = list(args.assets)
+    if args.file:
+        with open(args.file) as f: assets += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if args.top:
+        from .data import DataCollector
+        universe = DataCollector().get_market_universe(args.top, sparkline_7d=False)
+        if universe.empty: sys.exit("Could not load the market universe (API error or rate limit).")
+        assets += universe["id"].astype(str).tolist()
+    return list(dict.fromkeys(assets))
+
+def load_configs(args) -> list:
+    if not args.config:
+        return [{"asset": args.asset, "days": args.days, "cash": args.cash, "qty": args.qty, "backend": args.backend,
+                 "seed": args.seed, "start_price": args.start_price, "price_source": args.price_source, "report": not args.no_report}]
+    with open(args.config) as f: text = f.read()
+    if args.config.endswith((".jsonl", ".ndjson")): data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else: data = json.loads(text)
+    defaults = {}
+    if isinstance(data, dict): defaults, data = data.get("defaults", {}), data.get("runs", [])
+    return [{"backend": args.backend, "days": args.days, "report": not args.no_report, **defaults, **run} for run in data]
+
+def emit(records, out, fields, label):
+    """Streams records to --out (.jsonl/.parquet/.csv) or stdout as JSON lines; progress goes to stderr."""
+    from .sweep import ResultWriter
+    writer = ResultWriter(out, schema=api.schema(fields) if out and out.endswith(".parquet") else None) if out else None
+    names = [name for name, _ in fields]
+    n = errors = 0
+    started = time.perf_counter()
+    try:
+        for record in records:
+            row = {k: record.get(k) for k in names}
+            n += 1; errors += bool(row.get("error"))
+            if writer: writer.write([row])
+            else: print(json.dumps(row, default=str), flush=True)
+            print(f"\r{label}: {n} done, {errors} failed", end="", file=sys.stderr, flush=True)
+    finally:
+        if writer: writer.close()
+    print(f"\r{label}: {n} done, {errors} failed in {time.perf_counter() - started:.1f}s" + (f" -> {out}" if out else ""), file=sys.stderr)
+    return 1 if n and errors == n else 0
+
+def cmd_audit(args):
+    assets = load_assets(args)
+    if not assets: sys.exit("No assets given (positional, --file or --top).")
+    records = api.run_audits(assets, workers=args.workers, sentiment=not args.no_sentiment, days=args.history_days)
+    return emit(records, args.out, api.AUDIT_FIELDS, "audit")
+
+def cmd_simulate(args):
+    configs = load_configs(args)
+    history = None
+    if args.save_history:
+        from .history import HistoryStore
+        history = HistoryStore()
+    records = api.run_simulations(configs, workers=args.workers, history=history, trace_dir=args.traces)
+    return emit(records, args.out, api.SIMULATION_FIELDS, "simulate")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m backend.cli", description="Cognito Terminal, headless.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    audit = sub.add_parser("audit", help="Deep Audit (price, indicators, score, sentiment) for many assets")
+    audit.add_argument("assets", nargs="*", help="CoinGecko ids, 'BTC (bitcoin)', or tickers known in data.SYMBOL_IDS (BTC, ETH, SOL, ...)")
+    audit.add_argument("--file", help="text file with one asset per line")
+    audit.add_argument("--top", type=int, help="also audit the top N assets by market cap")
+    audit.add_argument("--no-sentiment", action="store_true", help="skip the LLM sentiment step")
+    audit.add_argument("--history-days", type=int, default=30)
+    audit.add_argument("--workers", type=int, default=API_WORKERS)
+    audit.add_argument("--out", help="output file (.jsonl, .parquet or .csv); JSON lines on stdout if omitted")
+    audit.set_defaults(func=cmd_audit)
+
+    sim = sub.add_parser("simulate", help="run one simulation, or a batch from --config")
+    sim.add_argument("--config", help="JSON / JSONL file of run configs")
+    sim.add_argument("--asset", default="BTC")
+    sim.add_argument("--days", type=int, default=30)
+    sim.add_argument("--cash", type=float, default=10000)
+    sim.add_argument("--qty", type=float, default=0.5)
+    sim.add_argument("--backend", choices=["ollama", "rules"], default="rules")
+    sim.add_argument("--seed", type=int)
+    sim.add_argument("--start-price", type=float)
+    sim.add_argument("--price-source", choices=["synthetic", "replay"], default="synthetic")
+    sim.add_argument("--no-report", action="store_true", help="skip the final report")
+    sim.add_argument("--workers", type=int, default=API_WORKERS)
+    sim.add_argument("--traces", help="directory for per-run Parquet traces")
+    sim.add_argument("--save-history", action="store_true", help="also record runs in the History tab database")
+    sim.add_argument("--out", help="output file (.jsonl, .parquet or .csv); JSON lines on stdout if omitted")
+    sim.set_defaults(func=cmd_simulate)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
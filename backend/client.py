@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from .telemetry import get_tracer
+from .config import COINGECKO_RATE, COINGECKO_BURST, HTTP_MAX_RETRIES, HTTP_BACKOFF, HTTP_POOL_SIZE
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class ApiError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+class TokenBucket:
+    """Thread-safe token bucket. Callers only wait once the burst budget is spent."""
+
+    def __init__(self, rate=COINGECKO_RATE, capacity=COINGECKO_BURST):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1.0) -> float:
+        # Takes the tokens now (possibly going negative) and returns how long the caller must wait.
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            wait = max(0.0, -self.tokens / self.rate) if self.rate > 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self, tokens=1.0) -> float:
+        wait = self.reserve(tokens)
+        if wait > 0: time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        # Server asked us to back off (429 / Retry-After): hold every caller, not just this one.
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 0.0)
+
+def retry_after_seconds(value, default):
+    if not value: return default
+    try: return max(0.0, float(value))
+    except ValueError: pass
+    try: return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError): return default
+
+class ApiClient:
+    def __init__(self, base_url, headers=None, limiter=None, max_retries=HTTP_MAX_RETRIES, backoff=HTTP_BACKOFF, pool_size=HTTP_POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.limiter = limiter or TokenBucket()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._requests = requests
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_json(self, path: str, params: dict = None, timeout: float = 10):
+        url = path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+        last_error = None
+        with get_tracer().span("http.get", path=path.split("?")[0]) as span:
+            waited = 0.0
+            for attempt in range(self.max_retries + 1):
+                waited += self.limiter.acquire()
+                span.set(attempts=attempt + 1, rate_wait=waited)
+                try:
+                    r = self.session.get(url, params=params, timeout=timeout)
+                except self._requests.RequestException as e:
+                    last_error = ApiError(str(e))
+                    if attempt < self.max_retries: time.sleep(self.backoff * (2 ** attempt))
+                    continue
+                span.set(status=r.status_code)
+                if r.status_code == 200:
+                    try: return r.json()
+                    except ValueError as e: raise ApiError(f"Invalid JSON from {url}: {e}", r.status_code)
+                last_error = ApiError(f"HTTP {r.status_code} for {url}", r.status_code)
+                if r.status_code not in RETRY_STATUS: break
+                delay = retry_after_seconds(r.headers.get("Retry-After"), self.backoff * (2 ** attempt))
+                if r.status_code == 429: self.limiter.pause(delay)
+                elif attempt < self.max_retries: time.sleep(delay)
+            raise last_error
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncApiClient:
+    """httpx.AsyncClient counterpart of ApiClient for fan-out requests (e.g. scanner pages).
+    Shares the same TokenBucket, so concurrent pages still respect the process-wide budget."""
+
+    def __init__(self, base_url, headers=None, limiter=None, max_retries=HTTP_MAX_RETRIES, backoff=HTTP_BACKOFF, pool_size=HTTP_POOL_SIZE):
+        import httpx
+        self._httpx = httpx
+        self.base_url = base_url.rstrip("/")
+        self.limiter = limiter or TokenBucket()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.client = httpx.AsyncClient(headers=headers or {}, limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size))
+
+    async def get_json(self, path: str, params: dict = None, timeout: float = 10):
+        url = path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+        last_error = None
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            wait = self.limiter.reserve()
+            if wait > 0: await asyncio.sleep(wait)
+            try:
+                r = await self.client.get(url, params=params, timeout=timeout)
+                # Coroutines interleave on one thread, so record a flat span rather than nesting.
+                get_tracer().record("http.get_async", time.perf_counter() - started, path=path, attempts=attempt + 1, status=r.status_code)
+            except self._httpx.HTTPError as e:
+                last_error = ApiError(str(e))
+                if attempt < self.max_retries: await asyncio.sleep(self.backoff * (2 ** attempt))
+                continue
+            if r.status_code == 200:
+                try: return r.json()
+                except ValueError as e: raise ApiError(f"Invalid JSON from {url}: {e}", r.status_code)
+            last_error = ApiError(f"HTTP {r.status_code} for {url}", r.status_code)
+            if r.status_code not in RETRY_STATUS: break
+            delay = retry_after_seconds(r.headers.get("Retry-After"), self.backoff * (2 ** attempt))
+            if r.status_code == 429: self.limiter.pause(delay)
+            elif attempt < self.max_retries: await asyncio.sleep(delay)
+        raise last_error
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -1 +1,93 @@
-OLLAMA_MODEL = "llama3:8b"
\ No newline at end of file
+import os
+
+OLLAMA_MODEL = "llama3:8b"
+
+# Consensus trading rule (SimulationEngine / BatchSimulator defaults)
+BUY_THRESHOLD = 60
+SELL_THRESHOLD = 40
+BUY_FRACTION = 0.3
+SELL_FRACTION = 0.5
+
+# Agent voting: max concurrent oracle calls per step and per-call timeout (seconds)
+AGENT_MAX_WORKERS = 3
+AGENT_CALL_TIMEOUT = 60.0
+# HTTP timeout (s) for other Ollama requests (summaries, reports); streams apply it per read
+LLM_REQUEST_TIMEOUT = 300.0
+# Ask all voting roles in one JSON prompt (per-role calls remain the fallback)
+AGENT_BATCH_VOTES = True
+
+# Background simulation jobs: concurrent runs per process and how long finished jobs stay pollable (seconds)
+JOB_MAX_WORKERS = 4
+JOB_RETENTION = 3600
+# Live simulation view: metric/chart refreshes per second (new days are batched between frames)
+SIM_UI_FPS = 4
+
+# LLM response cache: in-memory LRU tier + optional SQLite tier (set COGNITO_LLM_CACHE_DB="" to disable)
+LLM_CACHE_SIZE = 512
+LLM_CACHE_TTL = 6 * 3600
+LLM_CACHE_DB = os.environ.get("COGNITO_LLM_CACHE_DB", "cognito_llm_cache.db")
+# SQLite tier: row cap, and how many writes between eviction passes (expired rows, then oldest over the cap)
+LLM_CACHE_DB_ROWS = 5000
+LLM_CACHE_PRUNE_EVERY = 64
+
+# CoinGecko HTTP client: token bucket (requests/sec + burst), retries on 429/5xx, connection pool size
+COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+COINGECKO_RATE = 0.5
+COINGECKO_BURST = 5
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF = 1.0
+HTTP_POOL_SIZE = 10
+# Full-universe scanner: CoinGecko's max page size for /coins/markets
+SCANNER_PAGE_SIZE = 250
+# Scanner sparklines: points kept per coin and downsampling method ("lttb" or "minmax")
+SPARKLINE_POINTS = 42
+SPARKLINE_METHOD = "lttb"
+# Max ids per /simple/price request in DataCollector.get_real_time_data_bulk
+PRICE_BULK_CHUNK = 100
+
+# Local market-data store (Arrow IPC files, one per asset). Set COGNITO_MARKET_STORE="" to disable.
+MARKET_STORE_DIR = os.environ.get("COGNITO_MARKET_STORE", "cognito_market_data")
+HISTORY_REFRESH_SECS = 300
+
+# Stale-while-revalidate data cache: seconds before a value is refreshed in the background
+SCANNER_TTL = 300
+PRICE_TTL = 30
+HISTORY_TTL = 300
+SWR_MAX_WORKERS = 4
+
+# Streaming feed: ticks kept per asset, per-subscriber queue size, live poll interval (s),
+# replay speed (historical seconds per real second)
+FEED_BUFFER = 2048
+FEED_QUEUE_SIZE = 1024
+FEED_POLL_SECS = 15
+FEED_REPLAY_SPEED = 3600
+# Seconds a Subscription iterator waits for the next tick before ending; producers nobody has
+# touched for FEED_IDLE_SECS (e.g. from a closed browser tab) are stopped by MarketFeed.reap.
+FEED_SUB_TIMEOUT = 30
+FEED_IDLE_SECS = 120
+
+# Simulation history (SQLite, WAL mode). The legacy JSON file is imported once if present.
+HISTORY_DB = os.environ.get("COGNITO_HISTORY_DB", "cognito_history.db")
+LEGACY_HISTORY_FILE = "cognito_history.json"
+
+# Batch sentiment: items and characters per LLM prompt, concurrent prompts, scanner refresh (s)
+SENTIMENT_BATCH_ITEMS = 12
+SENTIMENT_BATCH_CHARS = 4000
+SENTIMENT_MAX_WORKERS = 2
+SENTIMENT_TTL = 900
+# Fast local tier: feeds below this confidence (0-1) escalate to the LLM; a sampled share of confident
+# ones is also sent to measure agreement between tiers. Confidence is scaled down until the feed has
+# SENTIMENT_MIN_EVIDENCE total lexicon weight, so a single cue ("X is hot!") always escalates.
+# Features = hashed n-gram buckets.
+SENTIMENT_FAST_TIER = True
+SENTIMENT_CONFIDENCE = 0.5
+SENTIMENT_MIN_EVIDENCE = 3.0
+SENTIMENT_AUDIT_RATE = 0.05
+SENTIMENT_FEATURES = 1 << 16
+
+# Headless API / CLI: concurrent audits or simulations
+API_WORKERS = 4
+
+# Telemetry: timing spans kept in memory (COGNITO_TELEMETRY=0 disables tracing)
+TELEMETRY_ENABLED = os.environ.get("COGNITO_TELEMETRY", "1") != "0"
+TELEMETRY_MAX_SPANS = 20000
@@ -1,71 +1,211 @@
-import requests
+import asyncio
+import math
+import threading
 import time
+import numpy as np
 import pandas as pd
 import random
+from concurrent.futures import ThreadPoolExecutor
+from .client import ApiClient, AsyncApiClient
+from .config import COINGECKO_BASE_URL, PRICE_BULK_CHUNK, HISTORY_REFRESH_SECS, SPARKLINE_POINTS, SPARKLINE_METHOD, SCANNER_PAGE_SIZE, SCANNER_TTL, PRICE_TTL, HISTORY_TTL
+from . import sparkline
+from .store import get_store
+from . import swr
+from .telemetry import traced
+
+_client = None
+_client_lock = threading.Lock()
+
+# Compact dtypes for the full-universe scanner frame.
+CATEGORY_COLUMNS = ("id", "symbol", "name")
+FLOAT32_COLUMNS = ("current_price", "high_24h", "low_24h", "price_change_24h", "price_change_percentage_24h",
+                   "price_change_percentage_24h_in_currency", "market_cap_change_percentage_24h", "ath", "ath_change_percentage", "atl", "atl_change_percentage")
+FLOAT64_COLUMNS = ("market_cap", "fully_diluted_valuation", "total_volume", "market_cap_change_24h", "circulating_supply", "total_supply", "max_supply")
+
+# Simulation tickers -> CoinGecko ids.
+SYMBOL_IDS = {"BTC": "bitcoin", "ETH": "ethereum", "SOL": "solana", "AVAX": "avalanche-2", "XRP": "ripple", "DOGE": "dogecoin",
+              "BNB": "binancecoin", "ADA": "cardano", "DOT": "polkadot", "LINK": "chainlink", "LTC": "litecoin", "TRX": "tron"}
+
+def get_client() -> ApiClient:
+    # One pooled session and one rate-limit budget for every DataCollector in the process.
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ApiClient(COINGECKO_BASE_URL, headers={"User-Agent": "Mozilla/5.0"})
+        return _client
+
+def run_async(coro):
+    # asyncio.run from sync code; falls back to a helper thread if this thread already runs a loop.
+    try: asyncio.get_running_loop()
+    except RuntimeError: return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as ex: return ex.submit(asyncio.run, coro).result()
 
 class DataCollector:
-    def __init__(self):
-        self.base_url = "https://api.coingecko.com/api/v3"
-        self.headers = {"User-Agent": "Mozilla/5.0"}
+    def __init__(self, client: ApiClient = None, store=None, cache=None):
+        self.client = client or get_client()
+        self.base_url = self.client.base_url
+        self.store = store if store is not None else get_store()
+        self.cache = cache or swr.get_cache()
+        self._synced = {}
     
     def resolve_coin_id(self, query: str) -> str:
         query = str(query).lower().strip()
         if "(" in query and ")" in query:
             return query.split("(")[1].replace(")", "").strip()
-        return query
+        # Bare tickers ("BTC") are not CoinGecko ids; map the ones we know.
+        return SYMBOL_IDS.get(query.upper(), query)
 
-    def get_market_scanner_data(self, limit=50):
-        url = f"{self.base_url}/coins/markets"
+    @traced("data.scanner")
+    def get_market_scanner_data(self, limit=50, spark_points=SPARKLINE_POINTS, spark_method=SPARKLINE_METHOD):
         params = {"vs_currency": "usd", "order": "market_cap_desc", "per_page": limit, "page": 1, "sparkline": "true", "price_change_percentage": "24h"}
         try:
-            time.sleep(1.0)
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                formatted_data = []
-                for coin in data:
-                    raw_spark = coin.get('sparkline_in_7d', {}).get('price', [])
-                    coin['sparkline_processed'] = raw_spark[::4] if raw_spark else []
-                    formatted_data.append(coin)
-                return pd.DataFrame(formatted_data)
-            return pd.DataFrame()
-        except: return pd.DataFrame()
+            df = pd.DataFrame(self.client.get_json("coins/markets", params=params, timeout=10))
+            return self.process_sparklines(df, spark_points, spark_method)
+        except Exception: return pd.DataFrame()
 
-    def get_real_time_data(self, asset_input: str) -> dict:
-        asset_id = self.resolve_coin_id(asset_input)
+    @traced("data.universe")
+    def get_market_universe(self, top=1000, order="market_cap_desc", category=None, sparkline_7d=True,
+                            min_volume=None, min_market_cap=None, sort_by=None, ascending=False,
+                            spark_points=SPARKLINE_POINTS, spark_method=SPARKLINE_METHOD) -> pd.DataFrame:
+        """Top-N scanner across ceil(top / 250) /coins/markets pages fetched concurrently (httpx, shared rate limit).
+
+        order/category are applied server side by CoinGecko; min_volume, min_market_cap and sort_by
+        are applied to the merged frame. Returns compact dtypes: categoricals for id/symbol/name, float32 prices."""
+        pages = max(1, math.ceil(top / SCANNER_PAGE_SIZE))
+        per_page = min(top, SCANNER_PAGE_SIZE)
+        params = {"vs_currency": "usd", "order": order, "per_page": per_page, "sparkline": str(sparkline_7d).lower(), "price_change_percentage": "24h"}
+        if category: params["category"] = category
+        results = run_async(self._fetch_pages(params, pages))
+        frames = [pd.DataFrame(r) for r in results if isinstance(r, list) and r]
+        if not frames: return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True).drop_duplicates("id").head(top).reset_index(drop=True)
+        if min_volume is not None and "total_volume" in df: df = df[df["total_volume"].fillna(0) >= min_volume]
+        if min_market_cap is not None and "market_cap" in df: df = df[df["market_cap"].fillna(0) >= min_market_cap]
+        if sort_by and sort_by in df: df = df.sort_values(sort_by, ascending=ascending, na_position="last")
+        df = df.reset_index(drop=True)
+        if sparkline_7d: df = self.process_sparklines(df, spark_points, spark_method)
+        return self.compact_dtypes(df)
+
+    async def _fetch_pages(self, params, pages):
+        client = AsyncApiClient(self.base_url, headers=dict(self.client.session.headers), limiter=self.client.limiter)
         try:
-            time.sleep(0.5)
-            response = requests.get(f"{self.base_url}/simple/price", params={"ids": asset_id, "vs_currencies": "usd", "include_24hr_vol": "true", "include_24hr_change": "true", "include_market_cap": "true"}, headers=self.headers, timeout=5)
-            data = response.json()
-            if asset_id not in data: return {"error": f"Asset '{asset_id}' not found."}
-            d = data[asset_id]
-            return {"id": asset_id, "price": d.get('usd', 0), "volume_24h": d.get('usd_24h_vol', 0), "change_24h": d.get('usd_24h_change', 0), "market_cap": d.get('usd_market_cap', 0)}
-        except Exception as e: return {"error": str(e)}
+            tasks = [client.get_json("coins/markets", params={**params, "page": page}, timeout=15) for page in range(1, pages + 1)]
+            # A failed page is dropped rather than failing the whole scan.
+            return await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await client.aclose()
+
+    @staticmethod
+    def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+        for col in CATEGORY_COLUMNS:
+            if col in df: df[col] = df[col].astype("category")
+        for col in FLOAT32_COLUMNS:
+            if col in df: df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float32)
+        for col in FLOAT64_COLUMNS:
+            if col in df: df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float64)
+        if "market_cap_rank" in df: df["market_cap_rank"] = pd.to_numeric(df["market_cap_rank"], errors="coerce").astype("Int32")
+        return df
+
+    @staticmethod
+    @traced("data.sparklines")
+    def process_sparklines(df: pd.DataFrame, spark_points=SPARKLINE_POINTS, spark_method=SPARKLINE_METHOD) -> pd.DataFrame:
+        # All coins' 7d sparklines are downsampled together as one 2-D array (shape-preserving, not a stride).
+        if df.empty: return df
+        raw = df['sparkline_in_7d'] if 'sparkline_in_7d' in df else [None] * len(df)
+        df['sparkline_processed'] = sparkline.to_column(sparkline.downsample(sparkline.to_matrix(raw, pad_last=False), spark_points, spark_method))
+        return df
 
+    def get_real_time_data(self, asset_input: str) -> dict:
+        return self.get_real_time_data_bulk([asset_input])[asset_input]
+
+    @traced("data.quotes")
+    def get_real_time_data_bulk(self, asset_inputs: list, chunk_size: int = PRICE_BULK_CHUNK) -> dict:
+        # One /simple/price call per chunk of ids. Returns {input: get_real_time_data()-shaped dict}.
+        resolved = {a: self.resolve_coin_id(a) for a in asset_inputs}
+        ids = list(dict.fromkeys(resolved.values()))
+        quotes = {}
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i:i + chunk_size]
+            try:
+                data = self.client.get_json("simple/price", params={"ids": ",".join(chunk), "vs_currencies": "usd", "include_24hr_vol": "true", "include_24hr_change": "true", "include_market_cap": "true"}, timeout=5)
+                for asset_id in chunk:
+                    if asset_id not in data:
+                        quotes[asset_id] = {"error": f"Asset '{asset_id}' not found."}; continue
+                    d = data[asset_id]
+                    quotes[asset_id] = {"id": asset_id, "price": d.get('usd', 0), "volume_24h": d.get('usd_24h_vol', 0), "change_24h": d.get('usd_24h_change', 0), "market_cap": d.get('usd_market_cap', 0)}
+            except Exception as e:
+                for asset_id in chunk: quotes[asset_id] = {"error": str(e)}
+        return {a: quotes[asset_id] for a, asset_id in resolved.items()}
+
+    @traced("data.chart")
+    def _fetch_chart(self, path: str, params: dict) -> pd.DataFrame:
+        data = self.client.get_json(path, params=params, timeout=5)
+        prices = data.get('prices', [])
+        volumes = data.get('total_volumes', [])
+        if not prices: return pd.DataFrame()
+        df = pd.DataFrame(prices, columns=['timestamp', 'price'])
+        vol_clean = [v[1] for v in volumes]
+        df['volume'] = (vol_clean + [float('nan')] * len(df))[:len(df)]
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df.set_index('timestamp')
+
+    @traced("data.sync_history")
+    def sync_history(self, asset_id: str, days: int = 30) -> int:
+        # Pulls only points newer than the last stored timestamp. Returns rows added.
+        now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        bounds = self.store.bounds(asset_id)
+        first, last, step = bounds if bounds else (None, None, None)
+        # The provider's first point lands up to one sampling step after now - days, so allow that much slack
+        # before deciding the store does not reach back far enough and refetching the whole window.
+        if last is None or first - step > now - pd.Timedelta(days=days):
+            df = self._fetch_chart(f"coins/{asset_id}/market_chart", {"vs_currency": "usd", "days": days})
+            if last is not None: self.store.clear(asset_id)
+        else:
+            params = {"vs_currency": "usd", "from": int(last.timestamp()) + 1, "to": int(now.timestamp())}
+            df = self._fetch_chart(f"coins/{asset_id}/market_chart/range", params)
+        return self.store.append(asset_id, df)
+
+    @traced("data.history")
     def get_history(self, asset_id: str, days: int = 30) -> pd.DataFrame:
-        try:
-            time.sleep(0.5)
-            r = requests.get(f"{self.base_url}/coins/{asset_id}/market_chart", params={"vs_currency": "usd", "days": days}, headers=self.headers, timeout=5)
-            if r.status_code == 200:
-                data = r.json()
-                prices = data.get('prices', [])
-                volumes = data.get('total_volumes', [])
-                if not prices: return pd.DataFrame()
-                df = pd.DataFrame(prices, columns=['timestamp', 'price'])
-                vol_clean = [v[1] for v in volumes]
-                df['volume'] = vol_clean[:len(df)]
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                return df.set_index('timestamp')
-            return pd.DataFrame()
-        except: return pd.DataFrame()
+        if self.store is None:
+            try: return self._fetch_chart(f"coins/{asset_id}/market_chart", {"vs_currency": "usd", "days": days})
+            except Exception: return pd.DataFrame()
+        if time.monotonic() - self._synced.get((asset_id, days), float("-inf")) > HISTORY_REFRESH_SECS:
+            try:
+                self.sync_history(asset_id, days)
+                self._synced[(asset_id, days)] = time.monotonic()
+            except Exception: pass  # serve whatever is on disk
+        since = pd.Timestamp.now(tz="UTC").tz_localize(None) - pd.Timedelta(days=days)
+        return self.store.read(asset_id, since=since)
+
+    # Stale-while-revalidate wrappers: each returns (value, meta) and serves the last good value
+    # while a single background refresh runs. See swr.SWRCache.
+    def cached_scanner(self, top=50, ttl=SCANNER_TTL):
+        loader = (lambda: self.get_market_scanner_data(top)) if top <= 50 else (lambda: self.get_market_universe(top))
+        return self.cache.get(("scanner", self.base_url, top), loader, ttl)
+
+    def cached_quote(self, asset_input: str, ttl=PRICE_TTL):
+        asset_id = self.resolve_coin_id(asset_input)
+        return self.cache.get(("quote", self.base_url, asset_id), lambda: self.get_real_time_data(asset_id), ttl)
+
+    def cached_quotes(self, asset_inputs: list, ttl=PRICE_TTL) -> dict:
+        # Warms all cold ids with one bulk call, then reads each through the cache.
+        cold = [a for a in asset_inputs if self.cache.peek(("quote", self.base_url, self.resolve_coin_id(a))) is None]
+        if len(cold) > 1:
+            for a, quote in self.get_real_time_data_bulk(cold).items():
+                self.cache.put(("quote", self.base_url, self.resolve_coin_id(a)), quote)
+        return {a: self.cached_quote(a, ttl) for a in asset_inputs}
+
+    def cached_history(self, asset_id: str, days: int = 30, ttl=HISTORY_TTL):
+        return self.cache.get(("history", self.base_url, asset_id, days), lambda: self.get_history(asset_id, days), ttl)
 
     def generate_social_feed(self, asset_name: str, change_24h: float) -> list:
         return random.sample([f"{asset_name} is hot!", f"Hold {asset_name}."], 2)
 
+    @traced("data.start_price")
     def get_real_start_price(self, symbol):
-        ids = {"BTC": "bitcoin", "ETH": "ethereum", "SOL": "solana", "AVAX": "avalanche-2", "XRP": "ripple", "DOGE": "dogecoin"}
-        asset_id = ids.get(symbol.upper(), "bitcoin")
+        asset_id = SYMBOL_IDS.get(symbol.upper(), "bitcoin")
         try:
-            r = requests.get(f"{self.base_url}/simple/price?ids={asset_id}&vs_currencies=usd", headers=self.headers, timeout=5)
-            return float(r.json()[asset_id]['usd'])
+            data = self.client.get_json("simple/price", params={"ids": asset_id, "vs_currencies": "usd"}, timeout=5)
+            return float(data[asset_id]['usd'])
         except: return 50000.0
\ No newline at end of file
@@ -1,95 +1,139 @@
 import random
-import re
-import ollama
-from .config import OLLAMA_MODEL
-from .data import DataCollector
+from dataclasses import dataclass, asdict
+from .agents import ROLES, make_backend
+from .config import AGENT_MAX_WORKERS, AGENT_CALL_TIMEOUT, AGENT_BATCH_VOTES, BUY_THRESHOLD, SELL_THRESHOLD, BUY_FRACTION, SELL_FRACTION
 from .market import NoiseTraderAgent, ChaosAgent
+from .indicators import IncrementalIndicators
+from .telemetry import span, traced
+
+MOODS = ["Major Crash", "Bad News", "Neutral", "Good News", "Huge Pump"]
+
+@dataclass(frozen=True)
+class StrategyParams:
+    # BUY when the average vote >= buy_threshold (spend buy_fraction of cash),
+    # SELL when it is <= sell_threshold (sell sell_fraction of holdings).
+    buy_threshold: float = BUY_THRESHOLD
+    sell_threshold: float = SELL_THRESHOLD
+    buy_fraction: float = BUY_FRACTION
+    sell_fraction: float = SELL_FRACTION
+
+    @classmethod
+    def coerce(cls, params):
+        if params is None: return cls()
+        if isinstance(params, cls): return params
+        return cls(**params)
+
+    def as_dict(self):
+        return asdict(self)
 
 class SimulationEngine:
-    def __init__(self, user_cash, user_qty, asset_symbol):
-        self.collector = DataCollector()
-        self.price = self.collector.get_real_start_price(asset_symbol)
-        self.noise_env = NoiseTraderAgent()
-        self.chaos_agent = ChaosAgent()
+    def __init__(self, user_cash, user_qty, asset_symbol, parallel=True, max_workers=AGENT_MAX_WORKERS, call_timeout=AGENT_CALL_TIMEOUT,
+                 backend="ollama", seed=None, start_price=None, rng=None, params=None, prices=None, batch_votes=AGENT_BATCH_VOTES):
+        # backend: "ollama" (LLM personas), "rules" (deterministic, offline) or an AgentBackend instance.
+        # batch_votes: ollama only; one JSON prompt for all roles instead of one call per role.
+        # seed: fixes the market RNG (moods, noise, chaos votes); None keeps the global `random` module.
+        # rng: any random.Random-like object, e.g. batch.NumpyRandom to replay a BatchSimulator path.
+        # prices: optional iterable of prices or feed.Ticks (e.g. feed.replay_prices, or Subscription.prices(asset_id),
+        #   which waits up to its timeout for each tick); the first is the start price and each step moves to the
+        #   next one. Synthetic moves resume when it runs out.
+        self.params = StrategyParams.coerce(params)
+        self.rng = rng if rng is not None else random.Random(seed) if seed is not None else random
+        options = {"parallel": parallel, "max_workers": max_workers, "call_timeout": call_timeout, "batch_votes": batch_votes} if backend == "ollama" else {}
+        self.backend = make_backend(backend, **options)
+        self.prices = iter(prices) if prices is not None else None
+        if start_price is None and self.prices is not None: start_price = self._next_price()
+        self.collector = None
+        if start_price is None:
+            from .data import DataCollector  # HTTP stack only when a live start price is needed
+            self.collector = DataCollector()
+            start_price = self.collector.get_real_start_price(asset_symbol)
+        self.price = start_price
+        self.noise_env = NoiseTraderAgent(self.rng)
+        self.chaos_agent = ChaosAgent(self.rng)
         self.symbol = asset_symbol
         self.cash = user_cash
         self.crypto = user_qty
         self.initial_val = self.cash + (self.crypto * self.price)
+        self.indicators = IncrementalIndicators()
+        self.indicators.update(self.price)
+
+    def close(self):
+        self.backend.close()
 
-    def ask_ai_oracle(self, role, context):
-        prompt = f"""
-        Act as a {role}.
-        Context: {context}
-        Task: Analyze the situation. Should we BUY or SELL?
-        Output ONLY a single integer score from 0 (Strong Sell) to 100 (Strong Buy).
-        No text, just the number.
-        """
-        try:
-            res = ollama.chat(model=OLLAMA_MODEL, messages=[{'role': 'user', 'content': prompt}])
-            content = res['message']['content']
-            nums = re.findall(r'\d+', content)
-            if nums: return int(nums[0])
-            else: return 50
-        except: return 50
+    def _next_price(self):
+        if self.prices is None: return None
+        p = next(self.prices, None)
+        if p is None: self.prices = None; return None
+        return float(getattr(p, "price", p))
 
     def generate_daily_summary(self, day, headline, action, pnl_day):
-        prompt = f"Summarize this trading day in 1 short English sentence: Asset {self.symbol}, News '{headline}', Action {action}, PnL {pnl_day:.2f}%."
-        try:
-            res = ollama.chat(model=OLLAMA_MODEL, messages=[{'role': 'user', 'content': prompt}])
-            return res['message']['content'].strip()
-        except: return f"Day {day}: {action} executed."
+        return self.backend.summary(self.symbol, day, headline, action, pnl_day)
 
+    @traced("sim.report")
     def generate_final_report(self, logs):
-        try:
-            res = ollama.chat(model=OLLAMA_MODEL, messages=[{'role': 'user', 'content': f"Write a short financial report based on these logs: {logs}"}])
-            return res['message']['content']
-        except: return "Simulation Completed."
-
-    def step(self, day):
-        market_mood = random.choice(["Major Crash", "Bad News", "Neutral", "Good News", "Huge Pump"])
-        try:
-            prompt_news = f"Generate a 1-sentence crypto headline about {self.symbol}. The mood must be: {market_mood}."
-            res = ollama.chat(model=OLLAMA_MODEL, messages=[{'role': 'user', 'content': prompt_news}])
-            headline = res['message']['content'].strip()
-        except: headline = f"Market is unpredictable regarding {self.symbol}."
-        
+        return self.backend.report(logs)
+
+    def stream_final_report(self, logs, cancel=None):
+        return self.backend.report_stream(logs, cancel=cancel)
+
+    @traced("sim.step")
+    def step(self, day, on_token=None):
+        # on_token: optional callback fed the daily summary chunk by chunk as it is generated.
+        market_mood = self.rng.choice(MOODS)
+        with span("sim.headline", backend=self.backend.name): headline = self.backend.headline(self.symbol, market_mood, day)
+
         noise_impact, noise_log = self.noise_env.generate_noise()
         news_bias = 0.0
         if "bull" in headline.lower() or "high" in headline.lower(): news_bias = 0.04
         elif "bear" in headline.lower() or "low" in headline.lower(): news_bias = -0.04
-        
-        total_move = noise_impact + (news_bias * random.random())
-        self.price = self.price * (1 + total_move)
 
-        s_tech = self.ask_ai_oracle("Technical Analyst", f"Price changed by {total_move*100:.2f}%. Volatility is {'High' if abs(total_move)>0.03 else 'Low'}.")
-        s_news = self.ask_ai_oracle("News Sentiment Analyst", f"The current headline is: '{headline}'.")
-        s_risk = self.ask_ai_oracle("Risk Manager", f"We have ${self.cash:.0f} in cash and {self.crypto:.2f} coins.")
+        total_move = noise_impact + (news_bias * self.rng.random())
+        replayed = self._next_price()
+        if replayed is not None: total_move = replayed / self.price - 1
+        self.price = replayed if replayed is not None else self.price * (1 + total_move)
+        rsi = self.indicators.update(self.price).get('RSI_14')
+
+        facts = {"symbol": self.symbol, "move": total_move, "rsi": rsi, "headline": headline,
+                 "cash": self.cash, "crypto": self.crypto, "price": self.price}
+        with span("sim.votes", backend=self.backend.name): votes = self.backend.votes(facts)
+        s_tech, s_news, s_risk = (votes[r] for r in ROLES)
         s_chaos = self.chaos_agent.vote()
 
         avg_score = (s_tech + s_news + s_risk + s_chaos) / 4
         action = "HOLD"
         reason = "Neutral Consensus"
         prev_val = self.cash + (self.crypto * self.price)
-        
-        if avg_score >= 60 and self.cash > 0:
-            qty = (self.cash * 0.3) / self.price
-            self.crypto += qty; self.cash -= (self.cash * 0.3)
+
+        p = self.params
+        if avg_score >= p.buy_threshold and self.cash > 0:
+            qty = (self.cash * p.buy_fraction) / self.price
+            self.crypto += qty; self.cash -= (self.cash * p.buy_fraction)
             action = "BUY"
             reason = f"Buy ({avg_score:.0f})"
-        elif avg_score <= 40 and self.crypto > 0:
-            amt = self.crypto * 0.5
+        elif avg_score <= p.sell_threshold and self.crypto > 0:
+            amt = self.crypto * p.sell_fraction
             self.crypto -= amt; self.cash += (amt * self.price)
             action = "SELL"
             reason = f"Sell ({avg_score:.0f})"
 
         current_val = self.cash + (self.crypto * self.price)
         pnl_day = ((current_val - prev_val) / prev_val) * 100 if prev_val > 0 else 0
-        explanation = self.generate_daily_summary(day, headline, action, pnl_day)
+        with span("sim.summary", backend=self.backend.name):
+            if on_token is None:
+                explanation = self.generate_daily_summary(day, headline, action, pnl_day)
+            else:
+                parts = []
+                for chunk in self.backend.summary_stream(self.symbol, day, headline, action, pnl_day):
+                    parts.append(chunk); on_token(chunk)
+                explanation = "".join(parts).strip()
 
         return {
-            "day": day, "price": self.price, "headline": headline, "noise_log": noise_log,
+            "day": day, "price": self.price, "rsi": rsi, "headline": headline, "noise_log": noise_log,
             "scores": {"tech": s_tech, "news": s_news, "risk": s_risk, "chaos": s_chaos, "avg": avg_score},
-            "action": action, "reason": reason, 
+            "action": action, "reason": reason,
             "value": current_val, "cash": self.cash, "crypto_val": self.crypto * self.price,
             "explanation": explanation
-        }
\ No newline at end of file
+        }
+
+    def run(self, days):
+        return [self.step(day) for day in range(1, days + 1)]
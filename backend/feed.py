@@ -0,0 +1,273 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+import pandas as pd
+from .config import FEED_BUFFER, FEED_POLL_SECS, FEED_REPLAY_SPEED, FEED_QUEUE_SIZE, FEED_SUB_TIMEOUT, FEED_IDLE_SECS
+
+# Streaming market data: a source (async generator of Ticks) is pumped by a FeedProducer on its
+# own event-loop thread into a MarketBus, which keeps a ring buffer per asset and fans ticks out
+# to subscribers. Streamlit reruns read the buffers; background jobs can block on a Subscription.
+
+@dataclass(frozen=True)
+class Tick:
+    asset: str
+    ts: float          # epoch seconds of the observation (historical time for replays)
+    price: float
+    volume: float = None
+    source: str = "poll"
+
+class Subscription:
+    """Bounded queue of ticks for one consumer. When the consumer falls behind, the oldest ticks are dropped.
+    Iterating ends once no tick has arrived for `timeout` seconds (e.g. the producer stopped)."""
+
+    def __init__(self, bus, assets=None, maxsize=FEED_QUEUE_SIZE, timeout=FEED_SUB_TIMEOUT):
+        self.bus = bus
+        self.assets = set(assets) if assets else None
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.timeout = timeout
+        self.dropped = 0
+
+    def offer(self, tick: Tick):
+        if self.assets is not None and tick.asset not in self.assets: return
+        while True:
+            try: self.queue.put_nowait(tick); return
+            except queue.Full:
+                try: self.queue.get_nowait(); self.dropped += 1
+                except queue.Empty: pass
+
+    def get(self, timeout=None):
+        try: return self.queue.get(timeout=timeout)
+        except queue.Empty: return None
+
+    def drain(self) -> list:
+        out = []
+        while True:
+            try: out.append(self.queue.get_nowait())
+            except queue.Empty: return out
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __iter__(self):
+        while True:
+            tick = self.get(self.timeout)
+            if tick is None: return
+            yield tick
+
+    def prices(self, asset: str):
+        # Price path of one asset, e.g. SimulationEngine(prices=sub.prices("bitcoin")).
+        return (tick.price for tick in self if tick.asset == asset)
+
+class MarketBus:
+    """In-process pub/sub for ticks with a bounded ring buffer (deque) per asset."""
+
+    def __init__(self, maxlen=FEED_BUFFER):
+        self.maxlen = maxlen
+        self.buffers = {}
+        self.subscribers = []
+        self.published = 0
+        self._lock = threading.Lock()
+
+    def publish(self, tick: Tick):
+        with self._lock:
+            buf = self.buffers.get(tick.asset)
+            if buf is None: buf = self.buffers[tick.asset] = deque(maxlen=self.maxlen)
+            buf.append(tick)
+            self.published += 1
+            subscribers = list(self.subscribers)
+        for sub in subscribers: sub.offer(tick)
+
+    def subscribe(self, assets=None, maxsize=FEED_QUEUE_SIZE, timeout=FEED_SUB_TIMEOUT) -> Subscription:
+        sub = Subscription(self, assets, maxsize, timeout)
+        with self._lock: self.subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self.subscribers: self.subscribers.remove(sub)
+
+    def latest(self, asset: str):
+        with self._lock:
+            buf = self.buffers.get(asset)
+            return buf[-1] if buf else None
+
+    def ticks(self, asset: str, n: int = None) -> list:
+        with self._lock:
+            buf = list(self.buffers.get(asset, ()))
+        return buf[-n:] if n else buf
+
+    def frame(self, asset: str, n: int = None) -> pd.DataFrame:
+        # Buffer as a price/volume frame indexed by timestamp (for st.line_chart or indicators).
+        ticks = self.ticks(asset, n)
+        if not ticks: return pd.DataFrame(columns=["price", "volume"])
+        df = pd.DataFrame({"price": [t.price for t in ticks], "volume": [t.volume for t in ticks]},
+                          index=pd.to_datetime([t.ts for t in ticks], unit="s"))
+        df.index.name = "timestamp"
+        return df
+
+    def assets(self) -> list:
+        with self._lock: return list(self.buffers)
+
+
+class PollingSource:
+    """Live ticks from /simple/price: one bulk request per interval for all assets (the API has no push feed)."""
+
+    def __init__(self, collector, assets, interval=FEED_POLL_SECS):
+        self.collector = collector
+        self.assets = list(assets)
+        self.interval = interval
+
+    async def ticks(self):
+        while True:
+            started = time.monotonic()
+            quotes = await asyncio.to_thread(self.collector.get_real_time_data_bulk, self.assets)
+            now = time.time()
+            for q in quotes.values():
+                if "error" not in q: yield Tick(q["id"], now, float(q["price"]), q.get("volume_24h"), "poll")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+class ReplaySource:
+    """Local stand-in for a websocket: plays stored history back in timestamp order.
+
+    speed is historical seconds per wall-clock second (3600 = one hourly point per second);
+    speed=None emits as fast as the consumer takes them. Multiple assets are merged by time."""
+
+    def __init__(self, frames: dict, speed=FEED_REPLAY_SPEED, loop=False):
+        self.frames = frames
+        self.speed = speed
+        self.loop = loop
+
+    @classmethod
+    def from_collector(cls, collector, assets, days=30, **kwargs):
+        return cls({a: collector.get_history(a, days) for a in assets}, **kwargs)
+
+    def events(self) -> pd.DataFrame:
+        parts = []
+        for asset, df in self.frames.items():
+            if df is None or df.empty: continue
+            part = pd.DataFrame({"asset": asset, "ts": df.index.asi8 / 1e9 if isinstance(df.index, pd.DatetimeIndex) else df.index.astype(float),
+                                 "price": df["price"].to_numpy(float), "volume": df["volume"].to_numpy(float) if "volume" in df else float("nan")})
+            parts.append(part)
+        if not parts: return pd.DataFrame(columns=["asset", "ts", "price", "volume"])
+        return pd.concat(parts, ignore_index=True).sort_values("ts", kind="stable")
+
+    async def ticks(self):
+        events = self.events()
+        if events.empty: return
+        while True:
+            t0, wall0 = events["ts"].iloc[0], time.monotonic()
+            for asset, ts, price, volume in events.itertuples(index=False):
+                if self.speed:
+                    delay = (ts - t0) / self.speed - (time.monotonic() - wall0)
+                    if delay > 0: await asyncio.sleep(delay)
+                yield Tick(asset, float(ts), float(price), None if volume != volume else float(volume), "replay")
+            if not self.loop: return
+
+
+class FeedProducer:
+    """Runs one source on a private asyncio loop in a daemon thread and publishes into a bus."""
+
+    def __init__(self, bus: MarketBus, source):
+        self.bus = bus
+        self.source = source
+        self.error = None
+        self.done = threading.Event()
+        self._loop = None
+        self._task = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._main, name="market-feed", daemon=True)
+        self._thread.start()
+        return self
+
+    def _main(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self._pump())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError: pass
+        except Exception as e: self.error = str(e)
+        finally:
+            self._loop.close()
+            self.done.set()
+
+    async def _pump(self):
+        async for tick in self.source.ticks():
+            self.bus.publish(tick)
+
+    @property
+    def running(self):
+        return self._thread is not None and not self.done.is_set()
+
+    def stop(self, timeout=2.0):
+        if self.running and self._loop is not None and self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None: self._thread.join(timeout)
+
+
+class MarketFeed:
+    """One bus plus named producers (e.g. "live", "replay"); starting a name replaces its previous producer.
+    A feed shared between users should namespace names per user ("<session>:live"): producers belong to a name."""
+
+    def __init__(self, bus: MarketBus = None):
+        self.bus = bus or MarketBus()
+        self.producers = {}
+        self.seen = {}
+        self._lock = threading.Lock()
+
+    def start(self, name: str, source) -> FeedProducer:
+        with self._lock:
+            old = self.producers.pop(name, None)
+            if old is not None: old.stop()
+            producer = self.producers[name] = FeedProducer(self.bus, source).start()
+            self.seen[name] = time.monotonic()
+            return producer
+
+    def start_polling(self, collector, assets, interval=FEED_POLL_SECS, name="live"):
+        return self.start(name, PollingSource(collector, assets, interval))
+
+    def start_replay(self, collector, assets, days=30, speed=FEED_REPLAY_SPEED, loop=False, name="replay"):
+        return self.start(name, ReplaySource.from_collector(collector, assets, days, speed=speed, loop=loop))
+
+    def ensure(self, name: str, assets, start):
+        # Starts (or restarts) producer `name` unless it is already streaming exactly these assets.
+        self.touch(name)
+        producer = self.producers.get(name)
+        if producer is None or not producer.running or sorted(getattr(producer.source, "assets", None) or producer.source.frames) != sorted(assets):
+            start()
+
+    def touch(self, *names):
+        # Marks producers as still watched; see reap.
+        now = time.monotonic()
+        for name in names: self.seen[name] = now
+
+    def reap(self, max_idle=FEED_IDLE_SECS):
+        """Stops producers not started, ensured or touched in the last max_idle seconds."""
+        cutoff = time.monotonic() - max_idle
+        for name in [n for n in list(self.producers) if self.seen.get(n, 0) < cutoff]: self.stop(name)
+
+    def running(self, name: str) -> bool:
+        producer = self.producers.get(name)
+        return producer is not None and producer.running
+
+    def stop(self, name: str = None):
+        with self._lock:
+            for key in ([name] if name else list(self.producers)):
+                producer = self.producers.pop(key, None)
+                self.seen.pop(key, None)
+                if producer is not None: producer.stop()
+
+
+def daily_closes(history: pd.DataFrame, n: int = None) -> list:
+    """Last close of each UTC day from a stored price history (the path a replayed simulation walks)."""
+    if history is None or history.empty: return []
+    closes = history["price"].resample("1D").last().dropna().tolist()
+    return closes[-n:] if n else closes
+
+def replay_prices(collector, asset_id: str, days: int) -> list:
+    # days + 1 closes: the start price plus one per simulated day.
+    return daily_closes(collector.get_history(asset_id, max(days + 1, 30)), days + 1)
@@ -0,0 +1,131 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from .config import HISTORY_DB, LEGACY_HISTORY_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    days INTEGER,
+    initial REAL,
+    final REAL,
+    pnl REAL,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created);
+CREATE INDEX IF NOT EXISTS idx_runs_asset_created ON runs (asset, created);
+CREATE TABLE IF NOT EXISTS run_days (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    day INTEGER NOT NULL,
+    price REAL, value REAL, cash REAL, crypto_val REAL,
+    tech INTEGER, news INTEGER, risk INTEGER, chaos INTEGER, avg REAL,
+    action TEXT, reason TEXT, headline TEXT, explanation TEXT,
+    PRIMARY KEY (run_id, day)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+DAY_COLUMNS = ("day", "price", "value", "cash", "crypto_val", "tech", "news", "risk", "chaos", "avg", "action", "reason", "headline", "explanation")
+
+class HistoryStore:
+    """Simulation archive in SQLite (WAL). Appends are a single insert transaction, queries are
+    indexed by asset and date, and concurrent sessions can write without losing each other's entries."""
+
+    def __init__(self, path=HISTORY_DB, legacy_file=LEGACY_HISTORY_FILE):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+        if legacy_file: self._import_legacy(legacy_file)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run while another session writes.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _import_legacy(self, legacy_file):
+        if not os.path.exists(legacy_file): return
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone(): return
+        try:
+            with open(legacy_file, "r") as f: entries = json.load(f)
+        except (OSError, ValueError): entries = []
+        # BEGIN IMMEDIATE takes the write lock before re-checking the marker, so sessions or processes
+        # opening a fresh database at the same time import the legacy file exactly once.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+                # Legacy file is newest-first; insert oldest-first so ids follow time.
+                for e in reversed(entries):
+                    days = str(e.get("Duration", "")).split(" ")[0]
+                    conn.execute("INSERT INTO runs (created, asset, days, initial, final, pnl, summary) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 (e.get("Date", ""), e.get("Asset", ""), int(days) if days.isdigit() else None,
+                                  e.get("Initial ($)"), e.get("Final ($)"), e.get("PnL (%)"), e.get("Summary")))
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)", (legacy_file,))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def append(self, asset, days, start_val, end_val, pnl_percent, ai_summary, trace=None, created=None) -> int:
+        """Adds one run (and optionally its per-day steps, as returned by SimulationEngine.step). Returns the run id."""
+        created = created or datetime.now().strftime("%Y-%m-%d %H:%M")
+        conn = self._conn()
+        with conn:
+            cur = conn.execute("INSERT INTO runs (created, asset, days, initial, final, pnl, summary) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (created, asset.upper(), days, start_val, end_val, pnl_percent, ai_summary))
+            run_id = cur.lastrowid
+            if trace:
+                conn.executemany(f"INSERT INTO run_days (run_id, {', '.join(DAY_COLUMNS)}) VALUES (?{', ?' * len(DAY_COLUMNS)})",
+                                 (self._day_row(run_id, s) for s in trace))
+        return run_id
+
+    @staticmethod
+    def _day_row(run_id, s):
+        scores = s.get("scores", {})
+        return (run_id, s["day"], s.get("price"), s.get("value"), s.get("cash"), s.get("crypto_val"),
+                scores.get("tech"), scores.get("news"), scores.get("risk"), scores.get("chaos"), scores.get("avg"),
+                s.get("action"), s.get("reason"), s.get("headline"), s.get("explanation"))
+
+    @staticmethod
+    def _where(asset=None, since=None, until=None):
+        clauses, args = [], []
+        if asset: clauses.append("asset = ?"); args.append(asset.upper())
+        if since: clauses.append("created >= ?"); args.append(str(since))
+        if until: clauses.append("created < ?"); args.append(str(until))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def query(self, asset=None, since=None, until=None, limit=50, offset=0) -> list:
+        """Newest first, in the legacy cognito_history.json record shape (plus "id")."""
+        where, args = self._where(asset, since, until)
+        rows = self._conn().execute(f"SELECT * FROM runs{where} ORDER BY created DESC, id DESC LIMIT ? OFFSET ?", args + [limit, offset]).fetchall()
+        return [{"id": r["id"], "Date": r["created"], "Asset": r["asset"], "Duration": f"{r['days']} Days",
+                 "Initial ($)": r["initial"], "Final ($)": r["final"], "PnL (%)": r["pnl"], "Summary": r["summary"]} for r in rows]
+
+    def count(self, asset=None, since=None, until=None) -> int:
+        where, args = self._where(asset, since, until)
+        return self._conn().execute(f"SELECT COUNT(*) FROM runs{where}", args).fetchone()[0]
+
+    def assets(self) -> list:
+        return [r[0] for r in self._conn().execute("SELECT DISTINCT asset FROM runs ORDER BY asset")]
+
+    def trace(self, run_id) -> list:
+        rows = self._conn().execute(f"SELECT {', '.join(DAY_COLUMNS)} FROM run_days WHERE run_id = ? ORDER BY day", (run_id,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM run_days")
+            conn.execute("DELETE FROM runs")
@@ -0,0 +1,128 @@
+import math
+from collections import deque
+
+# Vectorized indicators. Inputs are a price Series (e.g. DataCollector.get_history()['price'])
+# or a DataFrame with one column per asset; outputs keep the same shape and index.
+# IncrementalIndicators below produces the same values one tick at a time in O(1).
+# pandas is imported inside the frame-level helpers so the engine's pure-Python path stays light.
+
+def sma(prices, n=20):
+    return prices.rolling(n, min_periods=n).mean()
+
+def ema(prices, n=20):
+    return prices.ewm(span=n, adjust=False, min_periods=n).mean()
+
+def rsi(prices, n=14):
+    # Wilder smoothing (alpha = 1/n) of gains and losses.
+    delta = prices.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1.0 / n, adjust=False, min_periods=n).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1.0 / n, adjust=False, min_periods=n).mean()
+    rs = gain / loss
+    out = 100 - 100 / (1 + rs)
+    return out.where(loss != 0, 100.0).where(gain.notna())
+
+def macd(prices, fast=12, slow=26, signal=9):
+    line = prices.ewm(span=fast, adjust=False).mean() - prices.ewm(span=slow, adjust=False).mean()
+    sig = line.ewm(span=signal, adjust=False).mean()
+    valid = prices.notna().cumsum() >= slow
+    return line.where(valid), sig.where(valid), (line - sig).where(valid)
+
+def rolling_std(prices, n=20):
+    return prices.rolling(n, min_periods=n).std(ddof=0)
+
+def bollinger(prices, n=20, k=2.0):
+    mid, sd = sma(prices, n), rolling_std(prices, n)
+    return mid + k * sd, mid, mid - k * sd
+
+def atr(prices, n=14):
+    # Close-only ATR: market_chart has no high/low, so the true range is |close - prev close|.
+    tr = prices.diff().abs()
+    return tr.ewm(alpha=1.0 / n, adjust=False, min_periods=n).mean()
+
+def zscore(prices, n=20):
+    return (prices - sma(prices, n)) / rolling_std(prices, n)
+
+def compute_indicators(history_df, price_col="price"):
+    import pandas as pd
+    if history_df is None or history_df.empty or price_col not in history_df: return pd.DataFrame()
+    p = history_df[price_col].astype(float)
+    out = pd.DataFrame(index=history_df.index)
+    out['price'] = p
+    out['SMA_20'], out['EMA_12'], out['EMA_26'] = sma(p, 20), ema(p, 12), ema(p, 26)
+    out['RSI_14'] = rsi(p, 14)
+    out['MACD'], out['MACD_Signal'], out['MACD_Hist'] = macd(p)
+    out['BB_Upper'], out['BB_Mid'], out['BB_Lower'] = bollinger(p)
+    out['ATR_14'] = atr(p, 14)
+    out['ATR_Pct'] = out['ATR_14'] / p * 100
+    out['ZScore_20'] = zscore(p, 20)
+    return out
+
+def latest_indicators(history_df) -> dict:
+    frame = compute_indicators(history_df)
+    if frame.empty: return {}
+    last = frame.iloc[-1]
+    return {k: (None if v != v else float(v)) for k, v in last.items()}
+
+
+class IncrementalIndicators:
+    """Streaming version of compute_indicators: update(price) is O(1) per tick."""
+
+    def __init__(self, rsi_n=14, fast=12, slow=26, signal=9, window=20, k=2.0, atr_n=14):
+        self.rsi_n, self.fast, self.slow, self.signal_n = rsi_n, fast, slow, signal
+        self.window, self.k, self.atr_n = window, k, atr_n
+        self.count = 0
+        self.prev = None
+        self.avg_gain = self.avg_loss = self.atr = None
+        self.ema_fast = self.ema_slow = self.ema_signal = None
+        self._win = deque(maxlen=window)
+        self._sum = self._sumsq = 0.0
+
+    @classmethod
+    def from_history(cls, prices, **kwargs):
+        inc = cls(**kwargs)
+        for p in prices: inc.update(float(p))
+        return inc
+
+    @staticmethod
+    def _ewm(prev, x, alpha):
+        return x if prev is None else prev + alpha * (x - prev)
+
+    def update(self, price: float) -> dict:
+        self.count += 1
+        if self.prev is not None:
+            delta = price - self.prev
+            a = 1.0 / self.rsi_n
+            self.avg_gain = self._ewm(self.avg_gain, max(delta, 0.0), a)
+            self.avg_loss = self._ewm(self.avg_loss, max(-delta, 0.0), a)
+            self.atr = self._ewm(self.atr, abs(delta), 1.0 / self.atr_n)
+        self.ema_fast = self._ewm(self.ema_fast, price, 2.0 / (self.fast + 1))
+        self.ema_slow = self._ewm(self.ema_slow, price, 2.0 / (self.slow + 1))
+        self.ema_signal = self._ewm(self.ema_signal, self.ema_fast - self.ema_slow, 2.0 / (self.signal_n + 1))
+        if len(self._win) == self.window:
+            old = self._win[0]
+            self._sum -= old; self._sumsq -= old * old
+        self._win.append(price)
+        self._sum += price; self._sumsq += price * price
+        self.prev = price
+        return self.snapshot()
+
+    def snapshot(self) -> dict:
+        price, out = self.prev, {}
+        out['price'] = price
+        if self.count > self.rsi_n:
+            out['RSI_14'] = 100.0 if self.avg_loss == 0 else 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        if self.count > self.atr_n:
+            out['ATR_14'] = self.atr
+            out['ATR_Pct'] = self.atr / price * 100 if price else None
+        if self.count >= self.slow:
+            line = self.ema_fast - self.ema_slow
+            out['MACD'], out['MACD_Signal'], out['MACD_Hist'] = line, self.ema_signal, line - self.ema_signal
+            out['EMA_26'] = self.ema_slow
+        if self.count >= self.fast: out['EMA_12'] = self.ema_fast
+        if len(self._win) == self.window:
+            mean = self._sum / self.window
+            sd = math.sqrt(max(self._sumsq / self.window - mean * mean, 0.0))
+            out['SMA_20'] = out['BB_Mid'] = mean
+            out['BB_Upper'], out['BB_Lower'] = mean + self.k * sd, mean - self.k * sd
+            out['ZScore_20'] = (price - mean) / sd if sd > 0 else None
+        return out
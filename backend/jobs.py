@@ -0,0 +1,121 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from .config import JOB_MAX_WORKERS, JOB_RETENTION, AGENT_BATCH_VOTES
+from .data import DataCollector, SYMBOL_IDS
+from .engine import SimulationEngine
+from .feed import replay_prices
+from .trace import SimulationTrace
+
+class SimulationJob:
+    """One simulation run executing on a JobRunner worker. Steps are appended to a columnar
+    SimulationTrace that any number of pollers can read from an offset, so a UI can detach and
+    re-subscribe without losing the run."""
+
+    def __init__(self, config: dict):
+        self.id = uuid.uuid4().hex[:12]
+        self.config = dict(config)
+        self.status = "queued"
+        self.trace = SimulationTrace(capacity=self.config["days"], symbol=self.config.get("asset"))
+        self.note = ""
+        self.report = ""
+        self.error = None
+        self.initial_val = None
+        self.run_id = None
+        self.created = time.time()
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def poll(self, since: int = 0) -> dict:
+        with self._lock:
+            n = len(self.trace)
+            return {"id": self.id, "status": self.status, "days": self.config["days"], "progress": n / max(1, self.config["days"]),
+                    "steps": self.trace.steps(since, n), "offset": n, "note": self.note, "report": self.report,
+                    "initial_val": self.initial_val, "error": self.error, "run_id": self.run_id}
+
+
+class JobRunner:
+    """Runs SimulationEngine jobs on a shared thread pool, independent of any Streamlit script run."""
+
+    def __init__(self, max_workers=JOB_MAX_WORKERS, history=None, retention=JOB_RETENTION):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sim-job")
+        self.history = history
+        self.retention = retention
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, config: dict) -> str:
+        """config: cash, qty, asset, days, plus optional backend, seed, start_price, params,
+        price_source ("synthetic" or "replay": walk stored daily closes) and prices (explicit path)."""
+        job = SimulationJob(config)
+        with self._lock:
+            self._prune()
+            self.jobs[job.id] = job
+        self.pool.submit(self._run, job)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock: return self.jobs.get(job_id)
+
+    def poll(self, job_id, since: int = 0):
+        job = self.get(job_id)
+        return job.poll(since) if job else None
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job: job.cancel_event.set()
+
+    def list(self) -> list:
+        with self._lock: return [j.poll(len(j.trace)) for j in self.jobs.values()]
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self.jobs.values() if j.finished and j.finished < cutoff]:
+            del self.jobs[job_id]
+
+    def _run(self, job: SimulationJob):
+        cfg = job.config
+        engine = None
+        try:
+            job.status = "running"
+            prices = cfg.get("prices")
+            if prices is None and cfg.get("price_source") == "replay":
+                asset_id = cfg.get("asset_id") or SYMBOL_IDS.get(cfg["asset"].upper(), cfg["asset"].lower())
+                prices = replay_prices(DataCollector(), asset_id, cfg["days"])
+                if len(prices) < 2: prices = None; job.note = "No stored history to replay; using synthetic prices."
+            engine = SimulationEngine(cfg["cash"], cfg["qty"], cfg["asset"], backend=cfg.get("backend", "ollama"),
+                                      seed=cfg.get("seed"), start_price=cfg.get("start_price"), params=cfg.get("params"), prices=prices,
+                                      batch_votes=cfg.get("batch_votes", AGENT_BATCH_VOTES))
+            job.initial_val = job.trace.initial_val = engine.initial_val
+            for day in range(1, cfg["days"] + 1):
+                if job.cancel_event.is_set(): job.status = "cancelled"; return
+                job.note = ""
+                def on_token(token):
+                    job.note += token
+                s = engine.step(day, on_token=on_token)
+                with job._lock: job.trace.append(s)
+            logs = job.trace.logs()
+            for token in engine.stream_final_report(logs, cancel=job.cancel_event):
+                job.report += token
+            if job.cancel_event.is_set(): job.status = "cancelled"; return
+            if self.history is not None:
+                final_val = float(job.trace.column("value")[-1])
+                pnl = (final_val - engine.initial_val) / engine.initial_val * 100
+                job.run_id = self.history.append(cfg["asset"], cfg["days"], engine.initial_val, final_val, pnl, job.report, trace=job.trace)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            if engine is not None: engine.close()
+            job.finished = time.time()
+
+    def shutdown(self):
+        for job in list(self.jobs.values()): job.cancel_event.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from .config import OLLAMA_MODEL, LLM_REQUEST_TIMEOUT, LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_DB, LLM_CACHE_DB_ROWS, LLM_CACHE_PRUNE_EVERY
+from .telemetry import get_tracer, llm_usage
+
+class LLMCache:
+    """Two-tier response cache keyed by (model, messages, options).
+    Memory tier is an LRU with TTL; the optional SQLite tier survives restarts. The database is opened
+    on first use and pruned every prune_every writes (expired rows, then the oldest beyond max_rows)."""
+
+    def __init__(self, max_size=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL, db_path=None, max_rows=LLM_CACHE_DB_ROWS, prune_every=LLM_CACHE_PRUNE_EVERY):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.prune_every = prune_every
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_failed = False
+        self._writes = 0
+        self.hits = self.misses = self.disk_hits = self.evicted = 0
+
+    def _conn(self):
+        # Called under self._lock. None when there is no SQLite tier or it could not be opened.
+        if self._db is None and self.db_path and not self._db_failed:
+            try:
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, model TEXT, value TEXT, created REAL)")
+                self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_created ON llm_cache (created)")
+                self._db.commit()
+                self._prune()
+            except sqlite3.Error: self._db, self._db_failed = None, True
+        return self._db
+
+    def _prune(self):
+        deleted = 0
+        if self.ttl is not None: deleted += self._db.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - self.ttl,)).rowcount
+        if self.max_rows:
+            deleted += self._db.execute("DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY created DESC LIMIT -1 OFFSET ?)", (self.max_rows,)).rowcount
+        self._db.commit()
+        self.evicted += deleted
+
+    @staticmethod
+    def make_key(model, messages, options=None) -> str:
+        payload = json.dumps({"model": model, "messages": messages, "options": options or {}}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created):
+        return self.ttl is not None and (time.time() - created) > self.ttl
+
+    def get(self, key):
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._mem.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._mem[key]
+            if self._conn() is not None:
+                row = self._db.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row and not self._expired(row[1]):
+                    self._store_mem(key, row[0], row[1])
+                    self.hits += 1; self.disk_hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, model=None):
+        now = time.time()
+        with self._lock:
+            self._store_mem(key, value, now)
+            if self._conn() is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO llm_cache (key, model, value, created) VALUES (?, ?, ?, ?)", (key, model, value, now))
+                    self._db.commit()
+                    self._writes += 1
+                    if self._writes % self.prune_every == 0: self._prune()
+                except sqlite3.Error: pass
+
+    def _store_mem(self, key, value, created):
+        self._mem[key] = (value, created)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_size: self._mem.popitem(last=False)
+
+    def clear(self, disk=True):
+        with self._lock:
+            self._mem.clear()
+            if disk and self._conn() is not None:
+                self._db.execute("DELETE FROM llm_cache"); self._db.commit()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "disk_hits": self.disk_hits, "evicted": self.evicted,
+                "size": len(self._mem), "hit_ratio": (self.hits / total) if total else 0.0}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def _ollama(timeout=LLM_REQUEST_TIMEOUT):
+    # Imported on first LLM call: the client (httpx, pydantic) costs ~0.4 s and quant-only use never needs it.
+    # One client per timeout; ollama's default client has none, so a hung server would block callers forever.
+    with _clients_lock:
+        client = _clients.get(timeout)
+        if client is None:
+            import ollama
+            client = _clients[timeout] = ollama.Client(timeout=timeout)
+        return client
+
+_cache = LLMCache(db_path=LLM_CACHE_DB or None)
+get_tracer().register_cache("llm", _cache.stats)
+
+def get_cache() -> LLMCache:
+    return _cache
+
+def chat(prompt: str, model: str = OLLAMA_MODEL, options: dict = None, use_cache: bool = True, format: str = None, timeout: float = None) -> str:
+    """Single-turn ollama.chat returning the message content. Errors (including timeouts) propagate to the caller.
+    format="json" (or a JSON schema dict) constrains the output to valid JSON. timeout defaults to LLM_REQUEST_TIMEOUT."""
+    messages = [{'role': 'user', 'content': prompt}]
+    key = LLMCache.make_key(model, messages, dict(options or {}, format=format) if format else options)
+    with get_tracer().span("llm.chat", model=model) as span:
+        if use_cache:
+            cached = _cache.get(key)
+            if cached is not None:
+                span.set(cached=True)
+                return cached
+        res = _ollama(timeout or LLM_REQUEST_TIMEOUT).chat(model=model, messages=messages, options=options, **({"format": format} if format else {}))
+        span.set(cached=False, **llm_usage(res))
+        content = res['message']['content']
+        if use_cache: _cache.put(key, content, model)
+        return content
+
+def stream_chat(prompt: str, model: str = OLLAMA_MODEL, options: dict = None, use_cache: bool = True, cancel=None):
+    """Generator over ollama.chat(stream=True) tokens. A cache hit is yielded as one chunk.
+
+    Stops early when `cancel` (a threading.Event) is set or when the consumer closes the generator;
+    either way the underlying HTTP stream is closed and the partial answer is not cached."""
+    messages = [{'role': 'user', 'content': prompt}]
+    key = LLMCache.make_key(model, messages, options)
+    tracer, started = get_tracer(), time.perf_counter()
+    if use_cache:
+        cached = _cache.get(key)
+        if cached is not None:
+            tracer.record("llm.stream", time.perf_counter() - started, model=model, cached=True)
+            yield cached
+            return
+    stream = _ollama().chat(model=model, messages=messages, options=options, stream=True)
+    parts, completed, usage, first = [], False, {}, None
+    try:
+        for chunk in stream:
+            if cancel is not None and cancel.is_set(): break
+            token = chunk['message']['content']
+            if chunk.get('done'): usage = llm_usage(chunk)
+            if token:
+                if first is None: first = time.perf_counter() - started
+                parts.append(token)
+                yield token
+        else: completed = True
+    finally:
+        close = getattr(stream, "close", None)
+        if close: close()
+        # Spans the whole generator lifetime, including time the consumer spent between chunks.
+        tracer.record("llm.stream", time.perf_counter() - started, model=model, cached=False, completed=completed, first_token_secs=first, **usage)
+    if completed and use_cache: _cache.put(key, "".join(parts), model)
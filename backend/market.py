@@ -1,9 +1,12 @@
 import random
 
 class NoiseTraderAgent:
+    def __init__(self, rng=random):
+        self.rng = rng
+
     def generate_noise(self):
-        sentiment = random.choice([-1, 1, 0, 0, 1]) 
-        volatility = random.uniform(0.005, 0.04) 
+        sentiment = self.rng.choice([-1, 1, 0, 0, 1]) 
+        volatility = self.rng.uniform(0.005, 0.04) 
         impact = sentiment * volatility
         log = "Calm."
         if impact > 0.02: log = "🌊 Noise: FOMO (+)"
@@ -11,5 +14,8 @@ class NoiseTraderAgent:
         return impact, log
 
 class ChaosAgent:
+    def __init__(self, rng=random):
+        self.rng = rng
+
     def vote(self):
-        return random.randint(0, 100)
\ No newline at end of file
+        return self.rng.randint(0, 100)
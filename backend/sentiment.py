@@ -0,0 +1,95 @@
+import re
+import threading
+import zlib
+import numpy as np
+from .config import SENTIMENT_FEATURES, SENTIMENT_MIN_EVIDENCE
+
+# Fast first tier for sentiment: a crypto lexicon projected onto hashed 1-3 gram features,
+# scored for a whole batch of feeds with a few NumPy reductions. Items it is unsure about
+# (weak or mixed signals) are escalated to the LLM by SocialAnalyst.
+
+LEXICON = {
+    "bullish": 2.0, "moon": 2.0, "mooning": 2.0, "rocket": 1.5, "pump": 1.5, "pumping": 1.5, "rally": 1.5, "breakout": 1.5,
+    "surge": 1.5, "ath": 1.5, "undervalued": 1.5, "hot": 1.0, "buy": 1.0, "buying": 1.0, "accumulate": 1.0, "gains": 1.0,
+    "green": 1.0, "strong": 1.0, "adoption": 1.0, "partnership": 1.0, "upgrade": 1.0, "hodl": 0.5,
+    "bearish": -2.0, "crash": -2.0, "crashing": -2.0, "plunge": -2.0, "rekt": -2.0, "hack": -2.0, "hacked": -2.0, "exploit": -2.0,
+    "delist": -2.0, "scam": -2.5, "rug": -2.5, "rugpull": -2.5, "rug pull": -2.5, "dump": -1.5, "dumping": -1.5, "bleeding": -1.5,
+    "overvalued": -1.5, "lawsuit": -1.5, "sell off": -1.5, "sell": -1.0, "selling": -1.0, "red": -1.0, "weak": -1.0, "fud": -1.0,
+    "fear": -1.0, "all time high": 1.5, "buy the dip": 1.0,
+}
+NEGATIONS = frozenset(("not", "no", "never", "isn't", "dont", "don't", "aint", "ain't", "without"))
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+def mood_for(score: float) -> str:
+    return "Bullish" if score >= 6.5 else "Bearish" if score <= 3.5 else "Neutral"
+
+def sampled(key: str, rate: float) -> bool:
+    # Deterministic sampling: the same feed is always (or never) picked for a cross-tier check.
+    return rate > 0 and zlib.crc32(key.encode("utf-8")) % 10000 < rate * 10000
+
+class FastSentiment:
+    """Lexicon scorer over hashed n-grams (n <= 3). score() maps feeds to 1-10 scores plus a 0-1 confidence:
+    |pos - neg| / (pos + neg + 1), scaled by min(1, (pos + neg) / min_evidence), so unknown vocabulary,
+    single weak cues and mixed signals all score low."""
+
+    def __init__(self, lexicon=LEXICON, n_features=SENTIMENT_FEATURES, min_evidence=SENTIMENT_MIN_EVIDENCE):
+        self.n_features = n_features
+        self.min_evidence = min_evidence
+        self.weights = np.zeros(n_features, dtype=np.float32)
+        for term, w in lexicon.items(): self.weights[self._hash(term.replace(" ", "_"))] = w
+
+    def _hash(self, token: str) -> int:
+        return zlib.crc32(token.encode("utf-8")) % self.n_features
+
+    def features(self, texts: list):
+        """(row, feature, sign) arrays for every n-gram; sign is -1 right after a negation word."""
+        rows, feats, signs = [], [], []
+        for i, text in enumerate(texts):
+            tokens = TOKEN_RE.findall(text.lower())
+            for j, tok in enumerate(tokens):
+                sign = -1.0 if j and tokens[j - 1] in NEGATIONS else 1.0
+                for n in (1, 2, 3):
+                    if j + n > len(tokens): break
+                    rows.append(i); feats.append(self._hash("_".join(tokens[j:j + n]))); signs.append(sign)
+        return np.asarray(rows, dtype=np.int64), np.asarray(feats, dtype=np.int64), np.asarray(signs, dtype=np.float32)
+
+    def score(self, feeds: list):
+        """feeds: list of post lists (or strings). Returns (scores float32 in 1-10, confidence float32 in 0-1)."""
+        texts = [" ".join(f) if isinstance(f, (list, tuple)) else str(f) for f in feeds]
+        rows, feats, signs = self.features(texts)
+        w = self.weights[feats] * signs
+        n = len(texts)
+        pos = np.bincount(rows, weights=np.clip(w, 0, None), minlength=n)
+        neg = np.bincount(rows, weights=np.clip(-w, 0, None), minlength=n)
+        scores = np.clip(5.0 + 5.0 * np.tanh((pos - neg) / 3.0), 1.0, 10.0)
+        evidence = pos + neg
+        confidence = np.abs(pos - neg) / (evidence + 1.0) * np.minimum(1.0, evidence / self.min_evidence)
+        return scores.astype(np.float32), confidence.astype(np.float32)
+
+class TierMetrics:
+    """Running counters for the tiered pipeline. Agreement compares the fast tier's mood with the LLM's
+    on every item both scored (escalations plus the sampled confident items)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.items = self.escalated = self.audited = self.compared = self.agreed = 0
+        self.abs_diff = 0.0
+
+    def record(self, items: int, escalated: int, audited: int, pairs):
+        # pairs: (fast score, llm score, llm mood) for items scored by both tiers.
+        with self._lock:
+            self.items += items; self.escalated += escalated; self.audited += audited
+            for fast, slow, mood in pairs:
+                self.compared += 1
+                self.agreed += mood_for(fast) == mood
+                self.abs_diff += abs(fast - slow)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"items": self.items, "fast": self.items - self.escalated, "escalated": self.escalated,
+                    "escalation_rate": (self.escalated / self.items) if self.items else 0.0, "audited": self.audited,
+                    "compared": self.compared, "agreement": (self.agreed / self.compared) if self.compared else None,
+                    "mean_abs_diff": (self.abs_diff / self.compared) if self.compared else None}
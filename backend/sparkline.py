@@ -0,0 +1,92 @@
+import numpy as np
+
+# Sparkline downsampling for the scanner. Everything works on one (n_coins, n_points) float array,
+# so hundreds of coins are reduced with a handful of NumPy passes instead of per-coin Python loops.
+
+def to_matrix(sparks, pad_last=True) -> np.ndarray:
+    """List of price lists (or CoinGecko {'price': [...]} dicts) -> (n, max_len) float64 array.
+    Shorter rows are padded with their last value (or NaN if pad_last=False); empty rows stay NaN.
+    Pass pad_last=False before downsample(), which reduces each row over its real length."""
+    rows = []
+    for s in sparks:
+        if isinstance(s, dict): s = s.get('price')
+        rows.append(s if s is not None else [])
+    width = max((len(r) for r in rows), default=0)
+    out = np.full((len(rows), width), np.nan)
+    for i, r in enumerate(rows):
+        if len(r):
+            out[i, :len(r)] = r
+            if pad_last: out[i, len(r):] = r[-1]
+    return out
+
+def minmax(matrix: np.ndarray, n_out: int) -> np.ndarray:
+    """Keeps the min and the max of each of n_out/2 time buckets, in time order, so peaks and troughs survive."""
+    n, width = matrix.shape
+    if width <= n_out: return matrix.copy()
+    buckets = max(1, n_out // 2)
+    edges = np.linspace(0, width, buckets + 1).astype(int)
+    starts = edges[:-1]
+    # Per-bucket argmin/argmax via reduceat on index-tagged values.
+    idx = np.arange(width)
+    filled_min = np.where(np.isnan(matrix), np.inf, matrix)
+    filled_max = np.where(np.isnan(matrix), -np.inf, matrix)
+    mins = np.minimum.reduceat(filled_min, starts, axis=1)
+    maxs = np.maximum.reduceat(filled_max, starts, axis=1)
+    bucket_of = np.searchsorted(edges, idx, side="right") - 1
+    is_min = filled_min == mins[:, bucket_of]
+    is_max = filled_max == maxs[:, bucket_of]
+    # First position of the min / max inside each bucket.
+    big = width + 1
+    min_pos = np.minimum.reduceat(np.where(is_min, idx, big), starts, axis=1)
+    max_pos = np.minimum.reduceat(np.where(is_max, idx, big), starts, axis=1)
+    first, second = np.minimum(min_pos, max_pos), np.maximum(min_pos, max_pos)
+    pos = np.stack([first, second], axis=2).reshape(n, -1)
+    pos = np.clip(pos, 0, width - 1)
+    return np.take_along_axis(matrix, pos, axis=1)
+
+def lttb(matrix: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets, vectorized across rows (x is the sample index)."""
+    n, width = matrix.shape
+    if width <= n_out or n_out < 3: return matrix.copy()
+    every = (width - 2) / (n_out - 2)
+    rows = np.arange(n)
+    selected = np.zeros((n, n_out), dtype=np.int64)
+    a = np.zeros(n, dtype=np.int64)
+    for i in range(n_out - 2):
+        nxt_start = int(np.floor((i + 1) * every)) + 1
+        nxt_end = min(int(np.floor((i + 2) * every)) + 1, width)
+        avg_x = (nxt_start + nxt_end - 1) / 2.0
+        avg_y = matrix[:, nxt_start:nxt_end].mean(axis=1)
+        cur_start = int(np.floor(i * every)) + 1
+        cur_end = int(np.floor((i + 1) * every)) + 1
+        xs = np.arange(cur_start, cur_end)
+        ys = matrix[:, cur_start:cur_end]
+        ya = matrix[rows, a][:, None]
+        area = np.abs((a[:, None] - avg_x) * (ys - ya) - (a[:, None] - xs[None, :]) * (avg_y[:, None] - ya))
+        area = np.where(np.isnan(area), -1.0, area)
+        a = cur_start + area.argmax(axis=1)
+        selected[:, i + 1] = a
+    selected[:, -1] = width - 1
+    return np.take_along_axis(matrix, selected, axis=1)
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
+def row_lengths(matrix: np.ndarray) -> np.ndarray:
+    # Length of each row up to its last non-NaN value (NaN tail = to_matrix padding).
+    valid = ~np.isnan(matrix)
+    return np.where(valid.any(axis=1), matrix.shape[1] - valid[:, ::-1].argmax(axis=1), 0)
+
+def downsample(matrix: np.ndarray, n_out: int, method: str = "lttb", dtype=np.float32) -> np.ndarray:
+    """(n, width) NaN-padded matrix -> (n, n_out) NaN-padded matrix. Each row is reduced over its own length
+    (rows are grouped by length, usually one or two groups), so short series never get a synthetic flat tail."""
+    lengths = row_lengths(matrix)
+    out = np.full((matrix.shape[0], min(n_out, matrix.shape[1])), np.nan, dtype=dtype)
+    for length in np.unique(lengths[lengths > 0]):
+        rows = np.flatnonzero(lengths == length)
+        part = METHODS[method](matrix[rows, :length], n_out)
+        out[rows, :part.shape[1]] = part
+    return out
+
+def to_column(matrix: np.ndarray) -> list:
+    # One float array per coin for a DataFrame column (NaN padding dropped), e.g. st.column_config.LineChartColumn.
+    return [row[~np.isnan(row)] for row in matrix]
@@ -0,0 +1,113 @@
+import os
+import re
+import threading
+import pandas as pd
+from .config import MARKET_STORE_DIR
+
+def _pa():
+    # pyarrow is loaded on first store access rather than with the backend.
+    import pyarrow as pa
+    import pyarrow.ipc
+    return pa
+
+def schema():
+    pa = _pa()
+    return pa.schema([("timestamp", pa.timestamp("ms")), ("price", pa.float64()), ("volume", pa.float64())])
+
+class MarketStore:
+    """Per-asset price/volume history kept as uncompressed Arrow IPC files.
+
+    Arrow IPC (rather than Parquet) is used so reads are memory-mapped and zero-copy:
+    a repeat audit maps the file instead of decoding it. Writes go to a temp file and
+    are swapped in atomically, so readers never see a half-written series."""
+
+    def __init__(self, root=MARKET_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, asset_id: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^a-z0-9._-]", "_", asset_id.lower()) + ".arrow")
+
+    def read_table(self, asset_id: str):
+        path = self.path(asset_id)
+        if not os.path.exists(path): return None
+        pa = _pa()
+        try:
+            with pa.memory_map(path, "r") as source:
+                return pa.ipc.open_file(source).read_all()
+        except (pa.ArrowInvalid, OSError): return None
+
+    def read(self, asset_id: str, since=None) -> pd.DataFrame:
+        table = self.read_table(asset_id)
+        if table is None or table.num_rows == 0: return pd.DataFrame()
+        df = table.to_pandas().set_index("timestamp")
+        if since is not None: df = df[df.index >= pd.Timestamp(since)]
+        return df
+
+    def last_timestamp(self, asset_id: str):
+        table = self.read_table(asset_id)
+        if table is None or table.num_rows == 0: return None
+        return pd.Timestamp(table.column("timestamp")[-1].as_py())
+
+    def first_timestamp(self, asset_id: str):
+        table = self.read_table(asset_id)
+        if table is None or table.num_rows == 0: return None
+        return pd.Timestamp(table.column("timestamp")[0].as_py())
+
+    def bounds(self, asset_id: str):
+        """(first, last, step) timestamps of the stored series, step being the median spacing; None if empty."""
+        table = self.read_table(asset_id)
+        if table is None or table.num_rows == 0: return None
+        ts = table.column("timestamp").to_numpy()
+        step = pd.Timedelta(pd.Series(ts).diff().median()) if len(ts) > 1 else pd.Timedelta(0)
+        return pd.Timestamp(ts[0]), pd.Timestamp(ts[-1]), step
+
+    def append(self, asset_id: str, df: pd.DataFrame) -> int:
+        """Merge new rows (index = timestamp) into the stored series. Returns rows added."""
+        if df is None or df.empty: return 0
+        with self._lock:
+            current = self.read(asset_id)
+            new = df[['price', 'volume']].astype(float)
+            if not current.empty:
+                new = new[new.index > current.index[-1]]
+                if new.empty: return 0
+                step = current.index.to_series().diff().median()
+                if pd.notna(step) and step > pd.Timedelta(0):
+                    # Range queries over short windows come back at a finer granularity than the
+                    # stored series; keep the last point per stored-step bucket so spacing stays uniform.
+                    buckets = (new.index - current.index[-1]) // step
+                    new = new[buckets >= 1].groupby(buckets[buckets >= 1]).tail(1)
+                    if new.empty: return 0
+            merged = pd.concat([current, new]) if not current.empty else new
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            self._write(asset_id, merged)
+            return len(new)
+
+    def _write(self, asset_id: str, df: pd.DataFrame):
+        frame = df.reset_index().rename(columns={df.index.name or "index": "timestamp"})
+        frame['timestamp'] = pd.to_datetime(frame['timestamp']).astype("datetime64[ms]")
+        pa, schema_ = _pa(), schema()
+        table = pa.Table.from_pandas(frame[['timestamp', 'price', 'volume']], schema=schema_, preserve_index=False)
+        path = self.path(asset_id)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, schema_) as writer: writer.write_table(table)
+        os.replace(tmp, path)
+
+    def clear(self, asset_id: str = None):
+        with self._lock:
+            paths = [self.path(asset_id)] if asset_id else [os.path.join(self.root, f) for f in os.listdir(self.root) if f.endswith(".arrow")]
+            for p in paths:
+                if os.path.exists(p): os.remove(p)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    # Shared store for the process, or None when disabled via config.
+    global _store
+    if not MARKET_STORE_DIR: return None
+    with _store_lock:
+        if _store is None: _store = MarketStore(MARKET_STORE_DIR)
+        return _store
@@ -0,0 +1,134 @@
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+from .batch import BatchSimulator
+from .engine import StrategyParams
+
+# Parameter sweeps over StrategyParams using BatchSimulator, spread across a process pool.
+# Configs are generated lazily and results are streamed to CSV/Parquet chunk by chunk,
+# so the number of configurations is bounded by disk, not memory. ResultWriter is shared with api.py.
+
+def grid(space: dict):
+    """space: {param: [values, ...]} -> every combination, lazily."""
+    keys = list(space)
+    for values in itertools.product(*(space[k] for k in keys)):
+        yield dict(zip(keys, values))
+
+def random_search(space: dict, n: int, seed: int = 0):
+    """space: {param: (low, high)} for uniform floats or [choices] for discrete values."""
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        cfg = {}
+        for k, spec in space.items():
+            if isinstance(spec, tuple): cfg[k] = float(rng.uniform(spec[0], spec[1]))
+            else: cfg[k] = spec[int(rng.integers(0, len(spec)))]
+        yield cfg
+
+def config_seed(base_seed: int, index: int) -> int:
+    # Depends only on (base_seed, config index), never on which worker ran it.
+    return int(np.random.SeedSequence([base_seed, index]).generate_state(1)[0])
+
+def _run_chunk(start, configs, sim):
+    rows = []
+    for offset, cfg in enumerate(configs):
+        index = start + offset
+        seed = sim["seed"] if sim["common_random_numbers"] else config_seed(sim["seed"], index)
+        params = StrategyParams.coerce(cfg)
+        result = BatchSimulator(sim["user_cash"], sim["user_qty"], sim["start_price"], sim["symbol"], seed=seed, params=params).run(sim["n_paths"], sim["days"])
+        rows.append({"index": index, "seed": seed, **{k: float(v) for k, v in params.as_dict().items()}, **result.summary()})
+    return rows
+
+def _chunks(configs, chunk_size):
+    it = iter(configs)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(it, chunk_size))
+        if not chunk: return
+        yield start, chunk
+        start += len(chunk)
+
+class ResultWriter:
+    """Streams row dicts to .parquet (one row group per write), .jsonl or .csv.
+    schema: optional pyarrow schema; without it the first batch's inferred schema is used."""
+
+    def __init__(self, path, schema=None):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self.jsonl = path.endswith(".jsonl") or path.endswith(".ndjson")
+        self.schema = schema
+        self._writer = None
+        self._file = None
+
+    def write(self, rows):
+        if not rows: return
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pylist(rows, schema=self.schema)
+            if self._writer is None: self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        elif self.jsonl:
+            if self._file is None: self._file = open(self.path, "w")
+            self._file.writelines(json.dumps(r, default=str) + "\n" for r in rows)
+            self._file.flush()
+        else:
+            if self._writer is None:
+                self._file = open(self.path, "w", newline="")
+                self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0]))
+                self._writer.writeheader()
+            self._writer.writerows(rows)
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._writer is not None and self.parquet: self._writer.close()
+        if self._file is not None: self._file.close()
+
+def run_sweep(configs, out_path, n_paths=1000, days=60, user_cash=10000, user_qty=0.5, start_price=60000.0, symbol="BTC",
+              seed=0, common_random_numbers=False, workers=None, chunk_size=32, max_pending=None, on_chunk=None) -> dict:
+    """Evaluates every config (dicts of StrategyParams fields) with BatchSimulator and streams rows to out_path
+    (.parquet or .csv) in config order. common_random_numbers=True gives every config the same seed,
+    which makes differences between configs less noisy. Returns {"configs": n, "best": row with highest pnl_mean}."""
+    sim = {"n_paths": n_paths, "days": days, "user_cash": user_cash, "user_qty": user_qty, "start_price": start_price,
+           "symbol": symbol, "seed": seed, "common_random_numbers": common_random_numbers}
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    writer = ResultWriter(out_path)
+    total, best = 0, None
+    done, next_to_write = {}, 0
+    chunks = _chunks(configs, chunk_size)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            exhausted = False
+            while pending or not exhausted:
+                # Completed-but-unwritten chunks count toward the limit, so a slow early chunk can't let memory grow.
+                while not exhausted and len(pending) + len(done) < max_pending:
+                    item = next(chunks, None)
+                    if item is None: exhausted = True; break
+                    start, chunk = item
+                    pending[pool.submit(_run_chunk, start, chunk, sim)] = start
+                if not pending: break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for f in finished:
+                    done[pending.pop(f)] = f.result()
+                # Flush completed chunks in config order so the output file is deterministic.
+                while next_to_write in done:
+                    rows = done.pop(next_to_write)
+                    writer.write(rows)
+                    total += len(rows)
+                    next_to_write += len(rows)
+                    for r in rows:
+                        if best is None or r["pnl_mean"] > best["pnl_mean"]: best = r
+                    if on_chunk: on_chunk(total)
+    finally:
+        writer.close()
+    return {"configs": total, "best": best, "path": out_path}
@@ -0,0 +1,123 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import pandas as pd
+from .config import SWR_MAX_WORKERS
+from .telemetry import get_tracer
+
+def is_good(value) -> bool:
+    """Default validity check: empty frames, None and {"error": ...} payloads never replace a good value."""
+    if value is None: return False
+    if isinstance(value, pd.DataFrame): return not value.empty
+    if isinstance(value, dict): return "error" not in value
+    return True
+
+class Entry:
+    __slots__ = ("value", "fetched", "error", "error_at", "inflight")
+
+    def __init__(self):
+        self.value = None
+        self.fetched = None
+        self.error = None
+        self.error_at = None
+        self.inflight = None
+
+class SWRCache:
+    """Stale-while-revalidate cache shared by every session in the process.
+
+    A fresh entry is returned as is. A stale one is returned immediately while one background
+    refresh runs. Only a cold miss blocks, and concurrent callers for the same key wait on the
+    same upstream fetch (single flight). A failed or empty refresh keeps the last good value."""
+
+    def __init__(self, max_workers=SWR_MAX_WORKERS, validator=is_good):
+        self.validator = validator
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swr")
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = self.stale_hits = self.misses = self.refreshes = self.failures = 0
+
+    def get(self, key, loader, ttl: float, validator=None):
+        """Returns (value, meta). value is None only if nothing good has ever been loaded for key."""
+        validator = validator or self.validator
+        with self._lock:
+            entry = self._entries.setdefault(key, Entry())
+            if entry.fetched is None:
+                self.misses += 1
+                future = entry.inflight or self._start(key, entry, loader, validator)
+            else:
+                if time.time() - entry.fetched <= ttl: self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    if entry.inflight is None: self._start(key, entry, loader, validator)
+                return entry.value, self._meta(entry, ttl)
+        future.result()
+        with self._lock: return entry.value, self._meta(entry, ttl)
+
+    def _start(self, key, entry, loader, validator) -> Future:
+        # Called with the lock held.
+        self.refreshes += 1
+        entry.inflight = self.pool.submit(self._load, key, entry, loader, validator)
+        return entry.inflight
+
+    def _load(self, key, entry, loader, validator):
+        try:
+            with get_tracer().span("swr.refresh", key=str(key[0])): value, error = loader(), None
+            if not validator(value): value, error = None, (value.get("error") if isinstance(value, dict) else "empty response")
+        except Exception as e: value, error = None, str(e)
+        with self._lock:
+            if error is None:
+                entry.value, entry.fetched, entry.error, entry.error_at = value, time.time(), None, None
+            else:
+                self.failures += 1
+                entry.error, entry.error_at = error, time.time()
+            entry.inflight = None
+            # A cold miss that failed is forgotten, so the next caller retries instead of caching the failure.
+            if entry.fetched is None: self._entries.pop(key, None)
+
+    @staticmethod
+    def _meta(entry, ttl) -> dict:
+        age = (time.time() - entry.fetched) if entry.fetched is not None else None
+        return {"fetched": entry.fetched, "age": age, "stale": age is None or age > ttl,
+                "refreshing": entry.inflight is not None, "error": entry.error}
+
+    def put(self, key, value):
+        # Seeds an entry from a value fetched elsewhere (e.g. one bulk call covering many keys).
+        if not self.validator(value): return
+        with self._lock:
+            entry = self._entries.setdefault(key, Entry())
+            entry.value, entry.fetched, entry.error, entry.error_at = value, time.time(), None, None
+
+    def peek(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None: self._entries.clear()
+            else: self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.stale_hits + self.misses
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses, "refreshes": self.refreshes,
+                "failures": self.failures, "size": len(self._entries), "hit_ratio": ((self.hits + self.stale_hits) / total) if total else 0.0}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> SWRCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SWRCache()
+            get_tracer().register_cache("data", _cache.stats)
+        return _cache
+
+def describe(meta: dict) -> str:
+    """Short staleness label for the UI, e.g. "updated 42s ago · refreshing"."""
+    if not meta or meta.get("age") is None: return "no data"
+    age = meta["age"]
+    text = f"updated {age:.0f}s ago" if age < 120 else f"updated {age / 60:.0f} min ago"
+    if meta.get("refreshing"): text += " · refreshing"
+    if meta.get("error"): text += f" · last refresh failed: {meta['error']}"
+    return text
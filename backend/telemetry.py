@@ -0,0 +1,166 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from .config import TELEMETRY_ENABLED, TELEMETRY_MAX_SPANS
+
+# In-process tracing: timing spans (with parent links per thread), LLM token throughput and
+# registered cache statistics. Spans live in a bounded deque; export as JSON or Chrome trace
+# format (open in chrome://tracing or https://ui.perfetto.dev).
+
+class Span:
+    __slots__ = ("id", "name", "start", "duration", "thread", "parent", "attrs")
+
+    def __init__(self, id, name, start, thread, parent, attrs):
+        self.id = id
+        self.name = name
+        self.start = start
+        self.duration = None
+        self.thread = thread
+        self.parent = parent
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "name": self.name, "start": self.start, "duration": self.duration,
+                "thread": self.thread, "parent": self.parent, "attrs": self.attrs}
+
+class _NullSpan:
+    def set(self, **attrs): pass
+
+NULL_SPAN = _NullSpan()
+
+class Tracer:
+    def __init__(self, enabled=TELEMETRY_ENABLED, max_spans=TELEMETRY_MAX_SPANS):
+        self.enabled = enabled
+        self.spans = deque(maxlen=max_spans)
+        self.caches = {}
+        self._ids = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._epoch = time.time() - time.perf_counter()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None: stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def _span(self, name, attrs):
+        stack = self._stack()
+        with self._lock:
+            self._ids += 1
+            span = Span(self._ids, name, time.perf_counter(), threading.get_ident(), stack[-1].id if stack else None, attrs)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - span.start
+            stack.pop()
+            self.spans.append(span)
+
+    def span(self, name: str, **attrs):
+        """with tracer.span("data.history", asset=...) as s: ... s.set(rows=n). No-op when disabled."""
+        return self._span(name, attrs) if self.enabled else nullcontext(NULL_SPAN)
+
+    def record(self, name: str, duration: float, **attrs):
+        # For work timed elsewhere (e.g. a generator consumed across calls).
+        if not self.enabled: return
+        stack = self._stack()
+        with self._lock:
+            self._ids += 1
+            span = Span(self._ids, name, time.perf_counter() - duration, threading.get_ident(), stack[-1].id if stack else None, attrs)
+        span.duration = duration
+        self.spans.append(span)
+
+    def register_cache(self, name: str, stats_fn):
+        self.caches[name] = stats_fn
+
+    def snapshot(self) -> list:
+        return [s for s in list(self.spans) if s.duration is not None]
+
+    def stats(self) -> list:
+        """Per operation: count, total, mean, p50, p95, max (milliseconds), slowest first by total."""
+        import numpy as np
+        groups = {}
+        for s in self.snapshot(): groups.setdefault(s.name, []).append(s.duration)
+        rows = []
+        for name, durations in groups.items():
+            ms = np.asarray(durations) * 1000
+            rows.append({"operation": name, "count": len(ms), "total_ms": float(ms.sum()), "mean_ms": float(ms.mean()),
+                         "p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95)), "max_ms": float(ms.max())})
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def llm_stats(self) -> dict:
+        """Token totals and generation throughput over llm.* spans (uncached calls only)."""
+        calls = [s for s in self.snapshot() if s.name.startswith("llm.")]
+        generated = [s for s in calls if s.attrs.get("eval_count")]
+        tokens = sum(s.attrs["eval_count"] for s in generated)
+        eval_secs = sum(s.attrs.get("eval_duration", 0) for s in generated)
+        cached = sum(1 for s in calls if s.attrs.get("cached"))
+        return {"calls": len(calls), "cached": cached, "prompt_tokens": sum(s.attrs.get("prompt_eval_count", 0) for s in generated),
+                "completion_tokens": tokens, "tokens_per_sec": (tokens / eval_secs) if eval_secs else 0.0,
+                "wall_secs": sum(s.duration for s in calls if not s.attrs.get("cached"))}
+
+    def cache_stats(self) -> dict:
+        out = {}
+        for name, fn in self.caches.items():
+            try: out[name] = fn()
+            except Exception: pass
+        return out
+
+    def export_json(self, path=None) -> str:
+        payload = json.dumps({"spans": [s.as_dict() for s in self.snapshot()], "stats": self.stats(),
+                              "llm": self.llm_stats(), "caches": self.cache_stats()}, default=str)
+        if path:
+            with open(path, "w") as f: f.write(payload)
+        return payload
+
+    def export_chrome(self, path=None) -> str:
+        # Trace Event Format: complete ("X") events in microseconds.
+        events = [{"name": s.name, "cat": s.name.split(".")[0], "ph": "X", "pid": os.getpid(), "tid": s.thread,
+                   "ts": (self._epoch + s.start) * 1e6, "dur": s.duration * 1e6, "args": s.attrs} for s in self.snapshot()]
+        payload = json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str)
+        if path:
+            with open(path, "w") as f: f.write(payload)
+        return payload
+
+    def clear(self):
+        self.spans.clear()
+
+_tracer = Tracer()
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+def span(name: str, **attrs):
+    return _tracer.span(name, **attrs)
+
+def traced(name: str):
+    """Decorator: times every call of the function as span `name`."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _tracer.enabled: return fn(*args, **kwargs)
+            with _tracer.span(name): return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def llm_usage(res) -> dict:
+    # Ollama response counters: eval_count tokens generated in eval_duration ns.
+    out = {}
+    for key in ("prompt_eval_count", "eval_count", "eval_duration", "total_duration"):
+        try: value = res[key]
+        except (KeyError, TypeError): value = getattr(res, key, None)
+        if value is None: continue
+        out[key] = value / 1e9 if key.endswith("_duration") else int(value)
+    if out.get("eval_count") and out.get("eval_duration"): out["tokens_per_sec"] = out["eval_count"] / out["eval_duration"]
+    return out
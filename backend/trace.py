@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+# Columnar record of a simulation run. Numbers live in preallocated NumPy arrays, actions as int8
+# codes and text (headline, reason, summary) as UTF-8 bytes plus an int64 offsets array: the same
+# layout as an Arrow large_string column, so to_arrow() wraps the buffers without copying.
+
+ACTIONS = ("HOLD", "BUY", "SELL")
+ACTION_CODES = {a: i for i, a in enumerate(ACTIONS)}
+FLOAT_COLUMNS = ("price", "rsi", "value", "cash", "crypto_val", "avg")
+SCORE_COLUMNS = ("tech", "news", "risk", "chaos")
+TEXT_COLUMNS = ("headline", "noise_log", "reason", "explanation")
+
+def _grow(arr: np.ndarray, size: int) -> np.ndarray:
+    if size <= len(arr): return arr
+    out = np.empty(max(size, 2 * len(arr)), dtype=arr.dtype)
+    out[:len(arr)] = arr
+    return out
+
+class TextBuffer:
+    """Append-only strings in one uint8 array; item i is data[offsets[i]:offsets[i + 1]].
+    (A NumPy array rather than a bytearray: exported Arrow buffers keep the old array alive on growth.)"""
+
+    def __init__(self, capacity=16, avg_len=64):
+        self.data = np.empty(capacity * avg_len, dtype=np.uint8)
+        self.offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self.n = 0
+
+    def append(self, text):
+        raw = np.frombuffer(str(text if text is not None else "").encode("utf-8"), dtype=np.uint8)
+        start = self.offsets[self.n]
+        self.offsets = _grow(self.offsets, self.n + 2)
+        self.data = _grow(self.data, start + len(raw))
+        self.data[start:start + len(raw)] = raw
+        self.n += 1
+        self.offsets[self.n] = start + len(raw)
+
+    def __getitem__(self, i) -> str:
+        if i < 0: i += self.n
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __len__(self):
+        return self.n
+
+    def tolist(self, start=0, end=None) -> list:
+        return [self[i] for i in range(start, self.n if end is None else end)]
+
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.offsets.nbytes
+
+class SimulationTrace:
+    """Per-day simulation output, appended from SimulationEngine.step dicts.
+
+    Readers take a row count first and only look below it, so a UI thread can read while the
+    job thread appends (appends never move data below n; growth only happens past capacity)."""
+
+    def __init__(self, capacity=64, initial_val=None, symbol=None):
+        self.initial_val = initial_val
+        self.symbol = symbol
+        self.n = 0
+        self.day = np.zeros(capacity, dtype=np.int32)
+        self.floats = {c: np.full(capacity, np.nan) for c in FLOAT_COLUMNS}
+        self.scores = {c: np.zeros(capacity, dtype=np.int16) for c in SCORE_COLUMNS}
+        self.action = np.zeros(capacity, dtype=np.int8)
+        self.text = {c: TextBuffer(capacity) for c in TEXT_COLUMNS}
+
+    def append(self, step: dict):
+        i = self.n
+        if i >= len(self.day):
+            size = i + 1
+            self.day = _grow(self.day, size); self.action = _grow(self.action, size)
+            self.floats = {c: _grow(a, size) for c, a in self.floats.items()}
+            self.scores = {c: _grow(a, size) for c, a in self.scores.items()}
+        scores = step.get("scores", {})
+        self.day[i] = step["day"]
+        for c in FLOAT_COLUMNS:
+            v = scores.get(c) if c == "avg" else step.get(c)
+            self.floats[c][i] = np.nan if v is None else v
+        for c in SCORE_COLUMNS: self.scores[c][i] = scores.get(c, 0)
+        self.action[i] = ACTION_CODES[step.get("action", "HOLD")]
+        for c in TEXT_COLUMNS: self.text[c].append(step.get(c))
+        self.n = i + 1
+
+    def extend(self, steps):
+        for s in steps: self.append(s)
+
+    def __len__(self):
+        return self.n
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of a numeric column (day, action code, floats, scores) over the filled rows."""
+        n = self.n
+        if name == "day": return self.day[:n]
+        if name == "action": return self.action[:n]
+        if name in self.floats: return self.floats[name][:n]
+        return self.scores[name][:n]
+
+    def step(self, i: int) -> dict:
+        # The SimulationEngine.step dict shape, rebuilt on demand.
+        if i < 0: i += self.n
+        rsi = self.floats["rsi"][i]
+        return {"day": int(self.day[i]), "price": float(self.floats["price"][i]), "rsi": None if np.isnan(rsi) else float(rsi),
+                "headline": self.text["headline"][i], "noise_log": self.text["noise_log"][i],
+                "scores": {**{c: int(self.scores[c][i]) for c in SCORE_COLUMNS}, "avg": float(self.floats["avg"][i])},
+                "action": ACTIONS[self.action[i]], "reason": self.text["reason"][i],
+                "value": float(self.floats["value"][i]), "cash": float(self.floats["cash"][i]),
+                "crypto_val": float(self.floats["crypto_val"][i]), "explanation": self.text["explanation"][i]}
+
+    def steps(self, start=0, end=None) -> list:
+        return [self.step(i) for i in range(start, self.n if end is None else min(end, self.n))]
+
+    def __iter__(self):
+        for i in range(self.n): yield self.step(i)
+
+    def logs(self) -> str:
+        # Summaries one per line (what the final report prompt is fed).
+        return "".join(f"{s}\n" for s in self.text["explanation"].tolist(0, self.n))
+
+    def frame(self, start=0, end=None, text=True) -> pd.DataFrame:
+        n = self.n if end is None else min(end, self.n)
+        data = {"day": self.day[start:n], **{c: a[start:n] for c, a in self.floats.items()}, **{c: a[start:n] for c, a in self.scores.items()},
+                "action": pd.Categorical.from_codes(self.action[start:n], ACTIONS)}
+        if text: data.update({c: self.text[c].tolist(start, n) for c in TEXT_COLUMNS})
+        return pd.DataFrame(data)
+
+    def display_frame(self) -> pd.DataFrame:
+        """Transaction-log table; numbers stay numeric and are formatted by the UI's column config."""
+        n = self.n
+        return pd.DataFrame({"Day": self.day[:n], "Price": self.floats["price"][:n], "Action": pd.Categorical.from_codes(self.action[:n], ACTIONS),
+                             "Reason": self.text["reason"].tolist(0, n), "Cash": self.floats["cash"][:n], "Total Value": self.floats["value"][:n],
+                             "AI Summary": self.text["explanation"].tolist(0, n)})
+
+    def to_arrow(self):
+        import pyarrow as pa
+        n = self.n
+        columns = {"day": pa.array(self.day[:n])}
+        columns.update({c: pa.array(a[:n]) for c, a in self.floats.items()})
+        columns.update({c: pa.array(a[:n]) for c, a in self.scores.items()})
+        columns["action"] = pa.DictionaryArray.from_arrays(pa.array(self.action[:n]), pa.array(ACTIONS))
+        for c, buf in self.text.items():
+            columns[c] = pa.LargeStringArray.from_buffers(n, pa.py_buffer(buf.offsets[:n + 1]), pa.py_buffer(buf.data[:buf.offsets[n]]))
+        metadata = {"symbol": str(self.symbol or ""), "initial_val": str(self.initial_val if self.initial_val is not None else "")}
+        return pa.table(columns).replace_schema_metadata(metadata)
+
+    def write_parquet(self, path: str):
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path)
+
+    def nbytes(self) -> int:
+        return (self.day.nbytes + self.action.nbytes + sum(a.nbytes for a in self.floats.values())
+                + sum(a.nbytes for a in self.scores.values()) + sum(b.nbytes() for b in self.text.values()))
@@ -0,0 +1,60 @@
+"""Benchmark: vectorized QuantitativeAnalyst.batch_calculate vs the legacy row-wise apply.
+
+Run from the repo root:  python benchmarks/bench_batch_calculate.py [rows ...]
+"""
+import os
+import sys
+import time
+import zlib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.analysts import QuantitativeAnalyst
+
+def legacy_batch_calculate(df):
+    # Previous df.apply(axis=1) implementation, with crc32 in place of hash() so outputs are comparable.
+    def analyze_row(row):
+        change = row.get('price_change_percentage_24h', 0) or 0
+        base_score = 5.0
+        if change > 10: base_score += 3
+        elif change > 5: base_score += 2
+        elif change > 0: base_score += 1
+        elif change < -10: base_score -= 3
+        elif change < -5: base_score -= 2
+        variance = (zlib.crc32(row['symbol'].encode("utf-8")) % 20) / 10.0 - 1.0
+        final_score = max(1.0, min(10.0, base_score + variance))
+        rsi = max(20, min(90, 50 + (change * 2.0)))
+        signal = "HOLD"
+        if rsi > 75: signal = "SELL"
+        elif rsi < 35: signal = "BUY"
+        return pd.Series([round(rsi, 1), float(final_score), signal])
+    df[['RSI', 'Tech_Score', 'Signal']] = df.apply(analyze_row, axis=1)
+    return df
+
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "symbol": [f"c{i}" for i in range(n)],
+        "price_change_percentage_24h": rng.normal(0, 8, n),
+    })
+
+def bench(fn, df, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        frame = df.copy()
+        t0 = time.perf_counter(); fn(frame); best = min(best, time.perf_counter() - t0)
+    return best
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [50, 1_000, 10_000, 50_000]
+    quant = QuantitativeAnalyst()
+    print(f"{'rows':>8} {'apply (ms)':>12} {'vectorized (ms)':>16} {'speedup':>8}")
+    for n in sizes:
+        df = make_frame(n)
+        legacy, fast = legacy_batch_calculate(df.copy()), quant.batch_calculate(df.copy())
+        assert np.allclose(legacy['Tech_Score'].astype(float), fast['Tech_Score'])
+        assert np.allclose(legacy['RSI'].astype(float), fast['RSI'])
+        assert (legacy['Signal'] == fast['Signal']).all()
+        t_apply, t_vec = bench(legacy_batch_calculate, df), bench(quant.batch_calculate, df)
+        print(f"{n:>8} {t_apply*1e3:>12.2f} {t_vec*1e3:>16.2f} {t_apply/t_vec:>7.0f}x")
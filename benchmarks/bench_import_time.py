@@ -0,0 +1,54 @@
+"""Benchmark: cold import time of backend entry points, via `python -X importtime`, against a budget.
+
+Each module is imported in a fresh interpreter (best of --repeat runs). Fails (exit 1) if a module
+exceeds its budget or pulls in a heavy dependency it should only load on first use.
+
+Run from the repo root:  python benchmarks/bench_import_time.py [--repeat N] [--scale X]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> (budget in ms, heavy modules that must not be imported)
+BUDGETS = {
+    "backend.config": (20, ("numpy", "pandas", "ollama", "requests", "httpx", "pyarrow")),
+    "backend.engine": (150, ("numpy", "pandas", "ollama", "requests", "httpx", "pyarrow")),
+    "backend.llm": (100, ("ollama", "httpx", "numpy", "pandas")),
+    "backend.indicators": (50, ("pandas", "numpy")),
+    "backend.analysts": (700, ("ollama", "requests", "httpx")),
+    "backend.data": (800, ("ollama", "requests", "httpx")),
+    "backend.batch": (300, ("ollama", "requests", "httpx")),
+}
+
+def measure(module: str):
+    # -X importtime writes "import time: self | cumulative | name" lines (microseconds) to stderr.
+    code = f"import sys; import {module}; print(','.join(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    total = None
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module: total = int(parts[1]) / 1000
+    return total, set(proc.stdout.strip().split(","))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow machines / CI)")
+    args = parser.parse_args()
+    failed = False
+    print(f"{'module':<22}{'best ms':>10}{'budget':>10}  status")
+    for module, (budget, forbidden) in BUDGETS.items():
+        runs = [measure(module) for _ in range(args.repeat)]
+        best = min(r[0] for r in runs)
+        loaded = sorted(m for m in forbidden if m in runs[0][1])
+        ok = best <= budget * args.scale and not loaded
+        failed |= not ok
+        note = "ok" if ok else ("over budget" if not loaded else f"eagerly imports {', '.join(loaded)}")
+        print(f"{module:<22}{best:>10.1f}{budget * args.scale:>10.0f}  {note}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()